@@ -0,0 +1,186 @@
+import gc, json, os, sys, platform, tempfile, time, tracemalloc
+
+# Add the parent directory of the current file to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ACH_Benchmark.SyntheticData import write_xero_csv, write_generic_csv
+from ACH_Constant.Constant import DEFAULT_COMPANY_DETAILS
+from ACH_Service.ACH_CSVHandler import read_csv_data, validate_csv
+from ACH_Service.ACH_PayloadCreator import preparePayload
+from ACH_Service.ACH_Generator import ACHFileGenerator
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+TIME_TOLERANCE = 0.25           # Fail when a stage is more than 25% slower than the baseline...
+TIME_NOISE_FLOOR = 0.05         # ...and at least 50 ms slower, so tiny stages do not flap
+MEMORY_TOLERANCE = 0.25         # Fail when a stage's peak memory grows by more than 25%
+MEMORY_NOISE_FLOOR = 1024 * 1024
+REPEAT = 3                      # Timed runs per stage; the fastest is reported
+
+FORMATS = {
+    'Xero'      : write_xero_csv,
+    'Default'   : write_generic_csv,
+}
+
+def measure(stage, measureMemory=True, repeat=REPEAT):
+    """
+    Time a stage over several runs, keeping the fastest, then run it once more under
+    tracemalloc for its peak memory. Timing and memory are measured separately because
+    tracemalloc slows the stage down.
+
+    :return: (result of the last timed run, seconds, peak bytes allocated or None)
+    """
+    seconds = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = stage()
+        elapsed = time.perf_counter() - start
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+
+    peak = None
+    if measureMemory:
+        gc.collect()
+        tracemalloc.start()
+        stage()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, seconds, peak
+
+def benchmark(accountingSystem, rows, workDir, measureMemory=True, repeat=REPEAT):
+    """
+    Benchmark each generation stage on a synthetic CSV of the given size.
+    :return: A list of result dictionaries, one per stage.
+    """
+    csv_path = FORMATS[accountingSystem](os.path.join(workDir, f"{accountingSystem}_{rows}.csv"), rows)
+    ach_path = os.path.join(workDir, f"{accountingSystem}_{rows}.txt")
+    results = []
+
+    def record(stage, seconds, peak):
+        results.append({
+            "format"            : accountingSystem,
+            "rows"              : rows,
+            "stage"             : stage,
+            "seconds"           : round(seconds, 6),
+            "peak_bytes"        : peak,
+            "rows_per_second"   : round(rows / seconds) if seconds else None,
+        })
+
+    transactions, seconds, peak = measure(lambda: read_csv_data(accountingSystem, csv_path), measureMemory, repeat)
+    record("read_csv_data", seconds, peak)
+
+    _, seconds, peak = measure(lambda: validate_csv(accountingSystem, csv_path), measureMemory, repeat)
+    record("validate_csv", seconds, peak)
+
+    prepare = lambda: preparePayload(DEFAULT_COMPANY_DETAILS, [dict(transaction) for transaction in transactions])
+    payloads, seconds, peak = measure(prepare, measureMemory, repeat)
+    record("preparePayload", seconds, peak)
+
+    ach_content, seconds, peak = measure(lambda: ACHFileGenerator(payloads).generate(), measureMemory, repeat)
+    record("ACHFileGenerator.generate", seconds, peak)
+
+    def write():
+        with open(ach_path, 'w', newline='') as file:
+            file.write(ach_content)
+    _, seconds, peak = measure(write, measureMemory, repeat)
+    record("file_write", seconds, peak)
+
+    os.remove(csv_path)
+    os.remove(ach_path)
+    return results
+
+def compare(results, baseline):
+    """
+    Compare results with the baseline results.
+    :return: A list of regression messages; empty when nothing regressed.
+    """
+    expected = {(entry["format"], entry["rows"], entry["stage"]): entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in results:
+        base = expected.get((entry["format"], entry["rows"], entry["stage"]))
+        if base is None:
+            continue
+        name = f"{entry['format']} {entry['rows']} rows {entry['stage']}"
+        if entry["seconds"] > base["seconds"] * (1 + TIME_TOLERANCE) and entry["seconds"] - base["seconds"] > TIME_NOISE_FLOOR:
+            regressions.append(f"{name}: {entry['seconds']:.3f}s vs baseline {base['seconds']:.3f}s")
+        if (entry["peak_bytes"] is not None and base.get("peak_bytes") is not None
+                and entry["peak_bytes"] > base["peak_bytes"] * (1 + MEMORY_TOLERANCE)
+                and entry["peak_bytes"] - base["peak_bytes"] > MEMORY_NOISE_FLOOR):
+            regressions.append(f"{name}: peak {entry['peak_bytes']} bytes vs baseline {base['peak_bytes']} bytes")
+    return regressions
+
+def machine():
+    """The machine the results were measured on; timings only compare on the same machine."""
+    processor = platform.processor() or platform.machine()
+    try:
+        with open('/proc/cpuinfo') as file:
+            processor = next((line.split(':', 1)[1].strip() for line in file if line.startswith('model name')), processor)
+    except OSError:
+        pass
+    return {
+        "node"      : platform.node(),
+        "processor" : processor,
+        "cpus"      : os.cpu_count(),
+    }
+
+def get_option(name, default=None):
+    """Return the value following a command-line option such as '--sizes 1000,10000', or default."""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+def main():
+    """
+    Usage: python3 ACH_Benchmark/Benchmark.py [--sizes 1000,10000,100000] [--formats Xero,Default]
+                                             [--output results.json] [--baseline baseline.json]
+                                             [--repeat 3] [--update-baseline] [--no-memory]
+    """
+    sizes = [int(size) for size in get_option('--sizes', ",".join(map(str, DEFAULT_SIZES))).split(',')]
+    formats = get_option('--formats', ",".join(FORMATS)).split(',')
+    baseline_path = get_option('--baseline', BASELINE_PATH)
+    measure_memory = '--no-memory' not in sys.argv
+    repeat = int(get_option('--repeat', REPEAT))
+
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for accounting_system in formats:
+            for rows in sizes:
+                for entry in benchmark(accounting_system, rows, work_dir, measure_memory, repeat):
+                    results.append(entry)
+                    print(f"{entry['format']:8} {entry['rows']:>9} {entry['stage']:28} {entry['seconds']:10.4f}s {entry['peak_bytes'] or 0:>14} B")
+
+    report = {
+        "python"    : platform.python_version(),
+        "platform"  : platform.platform(),
+        "machine"   : machine(),
+        "recorded"  : time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "results"   : results,
+    }
+    output_path = get_option('--output')
+    if output_path:
+        with open(output_path, 'w') as file:
+            json.dump(report, file, indent=4)
+
+    if '--update-baseline' in sys.argv:
+        with open(baseline_path, 'w') as file:
+            json.dump(report, file, indent=4)
+        print(f"Baseline saved at: {baseline_path}")
+        return 0
+
+    if os.path.isfile(baseline_path):
+        with open(baseline_path) as file:
+            baseline = json.load(file)
+        if baseline.get("machine") != report["machine"]:
+            print(f"Note: the baseline was recorded on another machine ({baseline.get('machine')}); refresh it here with --update-baseline.")
+        regressions = compare(results, baseline)
+        if regressions:
+            print("PERFORMANCE REGRESSIONS against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import os, statistics, subprocess, sys, tempfile, time
+
+# Add the parent directory of the current file to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+MAIN_PATH = os.path.join(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')), 'main.py')
+DEFAULT_BUDGET = 0.25   # Seconds above a bare interpreter start allowed for a one-row 'main.py --csv' run
+DEFAULT_RUNS = 10
+
+SAMPLE_CSV = (
+    "ImmediateOrigin,ImmediateDestination,ImmediateOriginRoutingNumber,ImmediateDestinationRoutingNumber,Reference,"
+    "TransactionType,CompanyName,CompanyId,StandardEntryClassCode,EntryDescription,ReceivingDFI,"
+    "ReceivingBankAccountNumber,Amount,TransactionIdentifier,ReceiverName\n"
+    "ORIGIN,DESTINATION,123456789,021000021,REF,Credit,COMPANY,1234567890,PPD,PAYROLL,021000021,"
+    "123456789,100.00,TX1,JOHN SMITH\n"
+)
+
+# Runs main.py with PyQt5 made unimportable, then fails if any GUI module was loaded anyway,
+# or if no ACH file was written (main.py reports a failed generation and still exits with 0)
+HEADLESS_RUNNER = """
+import os, runpy, sys
+class BlockQt:
+    def find_spec(self, name, path=None, target=None):
+        if name.split('.')[0] == 'PyQt5':
+            raise ImportError('PyQt5 must not be imported by a headless run')
+sys.meta_path.insert(0, BlockQt())
+main_path, csv_path = sys.argv[1:]
+output_directory = os.path.dirname(csv_path)
+def ach_files():
+    return [name for name in os.listdir(output_directory) if name.endswith('.txt')]
+for name in ach_files():
+    os.remove(os.path.join(output_directory, name))
+sys.argv = [main_path, '--csv', csv_path]
+runpy.run_path(main_path, run_name='__main__')
+loaded = sorted(name for name in sys.modules if name.split('.')[0] in ('PyQt5', 'ACH_UI'))
+if loaded:
+    sys.exit('GUI modules loaded by a headless run: ' + ', '.join(loaded))
+if not ach_files():
+    sys.exit('main.py --csv did not write an ACH file')
+"""
+
+def timed_run(command):
+    """Run a command and return its wall time; raises CalledProcessError if it fails."""
+    start = time.perf_counter()
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+def get_option(name, default=None):
+    """Return the value following a command-line option such as '--runs 10', or default."""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+def main():
+    """
+    Usage: python3 ACH_Benchmark/StartupBudget.py [--budget 0.25] [--runs 10]
+
+    Checks that a CSV run of main.py does not import PyQt5 or the UI, and that its median
+    start-up and one-row generation time, over a bare interpreter start, stays within budget.
+    """
+    budget = float(get_option('--budget', DEFAULT_BUDGET))
+    runs = int(get_option('--runs', DEFAULT_RUNS))
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_path = os.path.join(work_dir, 'startup.csv')
+        with open(csv_path, 'w', newline='') as file:
+            file.write(SAMPLE_CSV)
+
+        try:
+            interpreter = statistics.median(timed_run([sys.executable, '-c', 'pass']) for _ in range(runs))
+            headless = statistics.median(
+                timed_run([sys.executable, '-c', HEADLESS_RUNNER, MAIN_PATH, csv_path]) for _ in range(runs)
+            )
+        except subprocess.CalledProcessError as e:
+            print(f"Error: Headless CSV run failed with exit status {e.returncode}.")
+            return 1
+
+    overhead = headless - interpreter
+    print(f"Interpreter start: {interpreter * 1000:.1f} ms")
+    print(f"main.py --csv (1 row): {headless * 1000:.1f} ms ({overhead * 1000:.1f} ms over the interpreter)")
+    if overhead > budget:
+        print(f"STARTUP BUDGET EXCEEDED: {overhead * 1000:.1f} ms > {budget * 1000:.0f} ms")
+        return 1
+    print(f"Within the start-up budget of {budget * 1000:.0f} ms.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+import csv, os, sys, random
+
+# Add the parent directory of the current file to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ACH_Constant.Constant import GENERIC_CSV_FORMAT
+
+FIRST_NAMES = ["JOHN", "MARY", "AHMED", "LI", "SOFIA", "RAJ", "ANNA", "CARLOS", "EMMA", "KENJI"]
+LAST_NAMES = ["SMITH", "GARCIA", "KHAN", "WANG", "ROSSI", "PATEL", "MULLER", "SILVA", "BROWN", "SATO"]
+
+def routing_number(rnd):
+    """Random 9-digit routing number with a valid ABA check digit."""
+    digits = [rnd.randint(0, 9) for _ in range(8)]
+    digits[0] = rnd.randint(0, 3)
+    total = sum(digit * weight for digit, weight in zip(digits, [3, 7, 1, 3, 7, 1, 3, 7]))
+    return "".join(map(str, digits)) + str((10 - total % 10) % 10)
+
+def synthetic_rows(rows, seed=0):
+    """
+    Yield synthetic transactions as (amount, routing number, account number, receiver name, reference, transaction identifier).
+    Receivers are drawn from a pool, so names and bank details repeat the way payroll and vendor runs do.
+    """
+    rnd = random.Random(seed)
+    pool = [
+        (routing_number(rnd), str(rnd.randint(10 ** 5, 10 ** 12)), f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}")
+        for _ in range(max(1, min(rows, 50000)))
+    ]
+    for index in range(rows):
+        routing, account, name = pool[rnd.randrange(len(pool))]
+        amount = f"{rnd.randint(1, 250000)}.{rnd.randint(0, 99):02d}"
+        yield amount, routing, account, name, f"INV{index % 100000}", f"TX{index}"
+
+def write_xero_csv(file_path, rows, seed=0):
+    """Write a XERO-format CSV (no headers; see XERO_CSV_FORMAT) with the given number of rows."""
+    with open(file_path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file, delimiter=',')
+        for amount, routing, account, name, reference, identifier in synthetic_rows(rows, seed):
+            writer.writerow([amount, routing + account, name, reference, identifier])
+    return file_path
+
+def write_generic_csv(file_path, rows, seed=0):
+    """Write a generic-format CSV (with GENERIC_CSV_FORMAT headers) with the given number of rows."""
+    with open(file_path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file, delimiter=',')
+        writer.writerow(GENERIC_CSV_FORMAT)
+        for amount, routing, account, name, reference, identifier in synthetic_rows(rows, seed):
+            writer.writerow([name, account, routing, amount, identifier, reference])
+    return file_path
+
+if __name__ == "__main__":
+    # Usage: python3 SyntheticData.py <Xero|Default> <rows> <output.csv>
+    if len(sys.argv) != 4:
+        print("Usage: python3 SyntheticData.py <Xero|Default> <rows> <output.csv>")
+        sys.exit(1)
+    writer = write_xero_csv if sys.argv[1] == 'Xero' else write_generic_csv
+    print(writer(sys.argv[3], int(sys.argv[2])))
@@ -6,11 +6,29 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from datetime import datetime
 from ACH_Util.FieldConfig import FieldConfig
-from ACH_Util.RecordConfig import RecordConfig
+from ACH_Util.RecordLayout import RecordLayout
 from ACH_Constant.Constant import PADDING_LEFT, PADDING_RIGHT
 
 
 class ACH_BatchHeader:
+    # Field configurations, compiled once into the class-level layout below
+    all_fields = [
+        FieldConfig(name="Record Type Code",            length=1,   padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=True, value="5"),
+        FieldConfig(name="Service Class Code",          length=3,   padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=False),
+        FieldConfig(name="Company Name",                length=16,  padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=False),
+        FieldConfig(name="Company Discretionary Data",  length=20,  padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=False, value=""),
+        FieldConfig(name="Company Id",                  length=10,  padding=PADDING_RIGHT,   fillChar="0",       mandatory=True,    constant=False),
+        FieldConfig(name="Standard Entry Class Code",   length=3,   padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=False),
+        FieldConfig(name="Company Entry Description",   length=10,  padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=False),   
+        FieldConfig(name="Company Descriptive Date",    length=6,   padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=False),
+        FieldConfig(name="Effective Entry Date",        length=6,   padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=False),
+        FieldConfig(name="Settlement Date",             length=3,   padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=True, value=""), 
+        FieldConfig(name="Originator Status Code",      length=1,   padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=True, value="1"),
+        FieldConfig(name="Originating DFI",             length=8,   padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=False),
+        FieldConfig(name="Batch Number",                length=7,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
+    ]
+    layout = RecordLayout(all_fields)
+
     def __init__(self, transactionType, companyName, companyId, standardEntryClassCode, entryDescription, effectiveTransactionDate, originatingBankRoutningNumber, batchNumber):
         """
         Initializes the Batch Header object.
@@ -20,7 +38,7 @@ class ACH_BatchHeader:
         :param companyId: Unique company ID (10 digits, e.g., EIN).
         :param standardEntryClassCode: Standard Entry Class Code (e.g., PPD, CCD).
         :param entryDescription: Description of the batch (10 characters max).
-        :param effectiveTransactionDate: Date when transactions should occur (YYMMDD format).
+        :param effectiveTransactionDate: Date when transactions should occur (YYMMDD format); today if empty.
         :param originatingBankRoutningNumber: Routing number of originating bank (first 8 digits).
         :param batchNumber: Unique batch number (7 digits).
         """
@@ -34,23 +52,8 @@ class ACH_BatchHeader:
         self.effectiveTransactionDate       = effectiveTransactionDate
         self.originatingBankRoutningNumber  = originatingBankRoutningNumber
         self.batchNumber                    = batchNumber
+        self.batchCreation                  = datetime.now()
 
-        # Define all field configurations for the header
-        self.all_fields = [
-            FieldConfig(name="Record Type Code",            length=1,   padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=True, value="5"),
-            FieldConfig(name="Service Class Code",          length=3,   padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=False),
-            FieldConfig(name="Company Name",                length=16,  padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=False),
-            FieldConfig(name="Company Discretionary Data",  length=20,  padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=False, value=""),
-            FieldConfig(name="Company Id",                  length=10,  padding=PADDING_RIGHT,   fillChar="0",       mandatory=True,    constant=False),
-            FieldConfig(name="Standard Entry Class Code",   length=3,   padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=False),
-            FieldConfig(name="Company Entry Description",   length=10,  padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=False),   
-            FieldConfig(name="Company Descriptive Date",    length=6,   padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=True, value=datetime.now().strftime('%y')),   
-            FieldConfig(name="Effective Entry Date",        length=6,   padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=True, value=datetime.now().strftime('%y%m%d')),
-            FieldConfig(name="Settlement Date",             length=3,   padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=True, value=""), 
-            FieldConfig(name="Originator Status Code",      length=1,   padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=True, value="1"),
-            FieldConfig(name="Originating DFI",             length=8,   padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=False),
-            FieldConfig(name="Batch Number",                length=7,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
-        ]
     
     
     def getServiceClassCode(self, transactionType):
@@ -69,15 +72,15 @@ class ACH_BatchHeader:
         """
         Generate the formatted Batch Header record.
         """
-        # Create a RecordConfig object to generate the formatted header
-        record = RecordConfig(self.all_fields)
         values = {
-            "Service Class Code"        : self.getServiceClassCode('MIX'),  # Receiver's bank routing number (variable)
+            "Service Class Code"        : self.getServiceClassCode(self.transactionType),
             "Company Name"              : self.companyName,  # Sender's EIN or routing number (variable)
             "Company Id"                : self.companyId,  # Receiver's bank name (variable)
             "Standard Entry Class Code" : self.standardEntryClassCode,  # Sender's company name (variable)
             "Company Entry Description" : self.entryDescription,
+            "Company Descriptive Date"  : self.batchCreation.strftime('%y'),
+            "Effective Entry Date"      : self.effectiveTransactionDate or self.batchCreation.strftime('%y%m%d'),
             "Originating DFI"           : self.originatingBankRoutningNumber,
             "Batch Number"              : self.batchNumber
         }
-        return record.generate(values)
\ No newline at end of file
+        return self.layout.generate(values)
\ No newline at end of file
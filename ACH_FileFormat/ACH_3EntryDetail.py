@@ -5,10 +5,28 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from ACH_Util.FieldConfig import FieldConfig
-from ACH_Util.RecordConfig import RecordConfig
+from ACH_Util.RecordLayout import RecordLayout
+from ACH_Util.Amount import toCents
 from ACH_Constant.Constant import PADDING_LEFT, PADDING_RIGHT
 
 class ACH_EntryDetail:
+    # Field configurations, compiled once into the class-level layout below
+    all_fields = [             
+        FieldConfig(name="Record Type Code",            length=1,   padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=True, value="6"),
+        FieldConfig(name="Transaction Code",            length=2,   padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=False),
+        FieldConfig(name="Receiving DFI",               length=8,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
+        FieldConfig(name="Check Digit",                 length=1,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
+        FieldConfig(name="Receiver Account Number",     length=17,  padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=False),
+        FieldConfig(name="Amount",                      length=10,  padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
+        FieldConfig(name="Transaction Identifier",      length=15,  padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=False),   
+        FieldConfig(name="Receiving Company Name",      length=22,  padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=False),
+        FieldConfig(name="Discretionary Data",          length=2,   padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=True, value=""),
+        FieldConfig(name="Addenda Record Indicator",    length=1,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=True, value="0"),
+        FieldConfig(name="Originating DFI",             length=8,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
+        FieldConfig(name="Entry Number",                length=7,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False) 
+    ]
+    layout = RecordLayout(all_fields)
+
     def __init__(self, transactionType, receivingBankRoutingNumber, receivingBankAccountNumber, amount, transactionIdentifier, receiverName, originatingBankRoutningNumber, entryNumber):
         """
         Initializes the Entry Detail object.
@@ -32,36 +50,20 @@ class ACH_EntryDetail:
         self.originatingBankRoutningNumber  = originatingBankRoutningNumber
         self.entryNumber                    = entryNumber
         
-        # Define all field configurations for the header
-        self.all_fields = [             
-            FieldConfig(name="Record Type Code",            length=1,   padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=True, value="6"),
-            FieldConfig(name="Transaction Code",            length=2,   padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=False),
-            FieldConfig(name="Receiving DFI",               length=8,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
-            FieldConfig(name="Check Digit",                 length=1,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
-            FieldConfig(name="Receiver Account Number",     length=17,  padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=False),
-            FieldConfig(name="Amount",                      length=10,  padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
-            FieldConfig(name="Transaction Identifier",      length=15,  padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=False),   
-            FieldConfig(name="Receiving Company Name",      length=22,  padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=False),
-            FieldConfig(name="Discretionary Data",          length=2,   padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=True, value=""),
-            FieldConfig(name="Addenda Record Indicator",    length=1,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=True, value="0"),
-            FieldConfig(name="Originating DFI",             length=8,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
-            FieldConfig(name="Entry Number",                length=7,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False) 
-        ]
-        
-    def getTransaction(self, transactionType):
+    @staticmethod
+    def getTransaction(transactionType):
         if transactionType == "Credit":
             return 22
         elif transactionType == "Debit":
             return 27
         
-    def formatAmount(self, amount):
-        # Ensure amount is a float and round to two decimal places
-        formatted_amount = round(float(amount), 2)
-        # Remove decimal and multiply by 100 (converting to cents)
-        amount_in_cents = int(formatted_amount * 100)
-        return amount_in_cents
+    @staticmethod
+    def formatAmount(amount):
+        # Convert the dollar amount to exact integer cents
+        return toCents(amount)
     
-    def calculateCheckDigit(self, routingNumber):
+    @staticmethod
+    def calculateCheckDigit(routingNumber):
         """
         Calculate the check digit for the routing number or return the 9th digit if it already exists.
         :param routingNumber: The routing number (8 or 9 digits)
@@ -91,20 +93,36 @@ class ACH_EntryDetail:
             # If the routing number is not 8 or 9 digits, raise an error
             raise ValueError("Routing number must be 8 or 9 digits.")
 
+    @staticmethod
+    def render(transactionType, receivingBankRoutingNumber, receivingBankAccountNumber, amountInCents, transactionIdentifier, receiverName, originatingBankRoutningNumber, entryNumber):
+        """
+        Render an Entry Detail record without building an ACH_EntryDetail object.
+        Takes the same arguments as the constructor, except that the amount is already in cents;
+        this is the per-entry hot path.
+        """
+        return ACH_EntryDetail.layout.render(
+            ACH_EntryDetail.getTransaction(transactionType),
+            receivingBankRoutingNumber,
+            ACH_EntryDetail.calculateCheckDigit(receivingBankRoutingNumber),
+            receivingBankAccountNumber,
+            amountInCents,
+            transactionIdentifier,
+            receiverName,
+            originatingBankRoutningNumber,
+            entryNumber
+        )
+
     def generate(self):
         """
         Generate the formatted Entry Detail record.
         """
-        record = RecordConfig(self.all_fields)
-        values = {
-            "Transaction Code"          : self.getTransaction(self.transactionType),
-            "Receiving DFI"             : self.receivingBankRoutingNumber,
-            "Check Digit"               : self.calculateCheckDigit(self.receivingBankRoutingNumber),
-            "Receiver Account Number"   : self.receivingBankAccountNumber,
-            "Amount"                    : self.formatAmount(self.amount),
-            "Transaction Identifier"    : self.transactionIdentifier,
-            "Receiving Company Name"    : self.receiverName,
-            "Originating DFI"           : self.originatingBankRoutningNumber,
-            "Entry Number"              : self.entryNumber
-        }
-        return record.generate(values)
\ No newline at end of file
+        return self.render(
+            self.transactionType,
+            self.receivingBankRoutingNumber,
+            self.receivingBankAccountNumber,
+            self.formatAmount(self.amount),
+            self.transactionIdentifier,
+            self.receiverName,
+            self.originatingBankRoutningNumber,
+            self.entryNumber
+        )
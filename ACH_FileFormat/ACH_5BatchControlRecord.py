@@ -5,11 +5,27 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from ACH_Util.FieldConfig import FieldConfig
-from ACH_Util.RecordConfig import RecordConfig
+from ACH_Util.RecordLayout import RecordLayout
 from ACH_Constant.Constant import PADDING_LEFT, PADDING_RIGHT
 
 class ACH_BatchControlRecord:
-    def __init__(self, entryAddendaCount, entryHash, totalDebitAmount, totalCreditAmount, companyId, originatingBankRoutingNumber, batchNumber):
+    # Field configurations, compiled once into the class-level layout below
+    all_fields = [             
+        FieldConfig(name="Record Type Code",                length=1,   padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=True, value="8"),
+        FieldConfig(name="Service Class Code",              length=3,   padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=False),
+        FieldConfig(name="Entry/Addenda Count",             length=6,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
+        FieldConfig(name="Entry Hash",                      length=10,  padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
+        FieldConfig(name="Total Debit Entry Dollar Amount", length=12,  padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
+        FieldConfig(name="Total Credit Entry Dollar Amount",length=12,  padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
+        FieldConfig(name="Company ID",                      length=10,  padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=False),   
+        FieldConfig(name="Reserved",                        length=19,  padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=True,  value=""),
+        FieldConfig(name="Reserved",                        length=6,   padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=True,  value=""),
+        FieldConfig(name="Originating DFI Identification",  length=8,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
+        FieldConfig(name="Batch Number",                    length=7,   padding=PADDING_LEFT,   fillChar="0",       mandatory=True,    constant=False) 
+    ]
+    layout = RecordLayout(all_fields)
+
+    def __init__(self, entryAddendaCount, entryHash, totalDebitAmount, totalCreditAmount, companyId, originatingBankRoutingNumber, batchNumber, serviceClassCode="200"):
         """
         Initializes the Batch Control Record object.
 
@@ -20,6 +36,7 @@ class ACH_BatchControlRecord:
         :param companyId: Same as Batch Header company_id (10 digits).
         :param originatingBankRoutingNumber: First 8 digits of the originating bank’s routing number.
         :param batchNumber: Same as Batch Header batch number (7 digits).
+        :param serviceClassCode: Same as Batch Header service class code (200=Mixed, 220=Credit, 225=Debit).
         """
 
         # Variables (Detail from CSV)
@@ -30,28 +47,15 @@ class ACH_BatchControlRecord:
         self.companyId                     = companyId
         self.originatingBankRoutingNumber  = originatingBankRoutingNumber
         self.batchNumber                   = batchNumber
-        
-        # Define all field configurations for the header
-        self.all_fields = [             
-            FieldConfig(name="Record Type Code",                length=1,   padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=True, value="8"),
-            FieldConfig(name="Service Class Code",              length=3,   padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=True, value="200"),
-            FieldConfig(name="Entry/Addenda Count",             length=6,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
-            FieldConfig(name="Entry Hash",                      length=10,  padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
-            FieldConfig(name="Total Debit Entry Dollar Amount", length=12,  padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
-            FieldConfig(name="Total Credit Entry Dollar Amount",length=12,  padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
-            FieldConfig(name="Company ID",                      length=10,  padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=False),   
-            FieldConfig(name="Reserved",                        length=19,  padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=True,  value=""),
-            FieldConfig(name="Reserved",                        length=6,   padding=PADDING_LEFT,    fillChar=" ",       mandatory=True,    constant=True,  value=""),
-            FieldConfig(name="Originating DFI Identification",  length=8,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
-            FieldConfig(name="Batch Number",                    length=7,   padding=PADDING_LEFT,   fillChar="0",       mandatory=True,    constant=False) 
-        ]
+        self.serviceClassCode              = serviceClassCode
+
         
     def generate(self):
         """
         Generate the formatted Batch Control Record.
         """
-        record = RecordConfig(self.all_fields)
         values = {
+            "Service Class Code"                : self.serviceClassCode,
             "Entry/Addenda Count"               : self.entryAddendaCount,
             "Entry Hash"                        : self.entryHash,
             "Total Debit Entry Dollar Amount"   : self.totalDebitAmount,
@@ -60,4 +64,4 @@ class ACH_BatchControlRecord:
             "Originating DFI Identification"    : self.originatingBankRoutingNumber,
             "Batch Number"                      : self.batchNumber
         }
-        return record.generate(values)
+        return self.layout.generate(values)
@@ -5,10 +5,23 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from ACH_Util.FieldConfig import FieldConfig
-from ACH_Util.RecordConfig import RecordConfig
+from ACH_Util.RecordLayout import RecordLayout
 from ACH_Constant.Constant import PADDING_LEFT, PADDING_RIGHT
 
 class ACH_FileControlRecord:
+    # Field configurations, compiled once into the class-level layout below
+    all_fields = [             
+        FieldConfig(name="Record Type Code",                length=1,   padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=True, value="9"),
+        FieldConfig(name="Batch Count",                     length=6,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
+        FieldConfig(name="Block Count",                     length=6,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
+        FieldConfig(name="Entry/Addenda Count",             length=8,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
+        FieldConfig(name="Entry Hash",                      length=10,  padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
+        FieldConfig(name="Total Debit Entry Dollar Amount", length=12,  padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
+        FieldConfig(name="Total Credit Entry Dollar Amount",length=12,  padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
+        FieldConfig(name="Reserved",                        length=39,  padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=True,  value="")
+    ]
+    layout = RecordLayout(all_fields)
+
     def __init__(self, batchCount, blockCount, entryAddendaCount, entryHash, totalDebitAmount, totalCreditAmount):
         """
         Initializes the File Control Record object.
@@ -29,23 +42,11 @@ class ACH_FileControlRecord:
         self.totalDebitAmount     = totalDebitAmount
         self.totalCreditAmount    = totalCreditAmount
 
-        # Define all field configurations for the header
-        self.all_fields = [             
-            FieldConfig(name="Record Type Code",                length=1,   padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=True, value="9"),
-            FieldConfig(name="Batch Count",                     length=6,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=True, value="1"),
-            FieldConfig(name="Block Count",                     length=6,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=True, value="1"),
-            FieldConfig(name="Entry/Addenda Count",             length=8,   padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
-            FieldConfig(name="Entry Hash",                      length=10,  padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
-            FieldConfig(name="Total Debit Entry Dollar Amount", length=12,  padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
-            FieldConfig(name="Total Credit Entry Dollar Amount",length=12,  padding=PADDING_LEFT,    fillChar="0",       mandatory=True,    constant=False),
-            FieldConfig(name="Reserved",                        length=39,  padding=PADDING_RIGHT,   fillChar=" ",       mandatory=True,    constant=True,  value="")
-        ]
         
     def generate(self):
         """
         Generate the formatted File Control Record.
         """
-        record = RecordConfig(self.all_fields)
         values = {
             "Batch Count"                       : self.batchCount,
             "Block Count"                       : self.blockCount,
@@ -54,4 +55,4 @@ class ACH_FileControlRecord:
             "Total Debit Entry Dollar Amount"   : self.totalDebitAmount,
             "Total Credit Entry Dollar Amount"  : self.totalCreditAmount,
         }
-        return record.generate(values)
+        return self.layout.generate(values)
@@ -0,0 +1,204 @@
+import logging, os, sys
+
+# Add the parent directory of the current file to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ACH_FileFormat.ACH_5BatchControlRecord import ACH_BatchControlRecord
+from ACH_FileFormat.ACH_6FileControlRecord import ACH_FileControlRecord
+from ACH_Service.ACH_Generator import PADDING_LINE, render_record
+from ACH_Service.ACH_Reader import ACHFileReader
+from ACH_Service.ACH_Totals import ACHTotals, MAX_BATCH_ENTRY_COUNT, MAX_BLOCK_COUNT, MAX_FILE_ENTRY_COUNT
+from ACH_Util.Logger import getLogger, logEvent
+
+logger = getLogger("appender")
+
+JOURNAL_SUFFIX = ".append-journal"     # Original bytes of the rewritten part of the file while an append runs
+ENTRY_HASH_MODULUS = 10 ** 10
+
+def locate_controls(reader):
+    """
+    Find the file control and the last batch control by walking back over the '9' padding
+    records from the end of the file, without indexing the whole file.
+    :return: (file control index, last batch control index)
+    """
+    index = len(reader) - 1
+    while index > 0 and reader.record(index).data == PADDING_LINE.encode('ascii'):
+        index -= 1
+    if reader.record_type(index) != b'9' or reader.record_type(index - 1) != b'8':
+        raise ValueError(f"'{reader.file_path}' does not end with a batch control and a file control record.")
+    return index, index - 1
+
+def last_entry_number(reader, controlIndex):
+    """Entry number (last 7 trace digits) of the last entry before a batch control, or 0 if the batch is empty."""
+    index = controlIndex - 1
+    while reader.record_type(index) == b'7':
+        index -= 1
+    if reader.record_type(index) != b'6':
+        return 0
+    return int(reader.record(index).field("Entry Number"))
+
+def control_totals(control):
+    """Entry count and debit/credit totals of a batch or file control record, as ACHTotals (without the entry hash)."""
+    totals = ACHTotals()
+    totals.entryAddendaCount    = int(control.field("Entry/Addenda Count"))
+    totals.totalDebitAmount     = int(control.field("Total Debit Entry Dollar Amount"))
+    totals.totalCreditAmount    = int(control.field("Total Credit Entry Dollar Amount"))
+    return totals
+
+def write_journal(ach_file_path, offset, original):
+    """
+    Save the bytes an append is about to overwrite, from offset to the end of the file.
+    The journal is written under a temporary name and renamed once synced, so an existing
+    journal is always complete.
+    """
+    journal_path = ach_file_path + JOURNAL_SUFFIX
+    with open(journal_path + ".tmp", 'wb') as journal:
+        journal.write(b"%d\n" % offset)
+        journal.write(original)
+        journal.flush()
+        os.fsync(journal.fileno())
+    os.replace(journal_path + ".tmp", journal_path)
+
+def restore_interrupted_append(ach_file_path):
+    """
+    Undo an append that was interrupted (crash, full disk) while rewriting the file, by writing
+    back the bytes saved in its journal.
+    :return: True if the file was restored, False if there was nothing to undo.
+    """
+    journal_path = ach_file_path + JOURNAL_SUFFIX
+    if not os.path.exists(journal_path):
+        return False
+    with open(journal_path, 'rb') as journal:
+        offset = int(journal.readline())
+        original = journal.read()
+    with open(ach_file_path, 'r+b') as file:
+        file.seek(offset)
+        file.write(original)
+        file.truncate()
+        file.flush()
+        os.fsync(file.fileno())
+    os.remove(journal_path)
+    logEvent(logger, logging.WARNING, "append_restored", file=ach_file_path)
+    return True
+
+def append_entries(ach_file_path, records, batchNumber=None):
+    """
+    Append entries to a batch of an existing ACH file in place.
+
+    Existing entries are not re-rendered: the new entries are inserted before the batch control,
+    and only the batch control, the records after it, the file control and the '9' padding are
+    rewritten. For the last batch (the default) that is a handful of records, whatever the file
+    size. For an earlier batch the later batches are moved as bytes, without being decoded.
+    Control totals and the entry hash are updated from the existing control records.
+
+    The bytes being rewritten are first saved to '<file>.append-journal'. If writing fails, they
+    are put back at once; if the process dies mid-write, the next append_entries call on the file
+    (or restore_interrupted_append) puts them back before doing anything else. Either way the file
+    ends up as it was before the append, or with the append complete; the journal is removed
+    once the file has been synced.
+
+    Args:
+        ach_file_path (str): ACH file to extend.
+        records (iterable): Payload records (as for ACHFileGenerator) to add to the batch.
+        batchNumber (int): Batch to extend; defaults to the last batch of the file.
+
+    Returns:
+        dict: Number of entries appended, the batch number, and the new file entry count and block count.
+
+    Raises:
+        ValueError: If the file is not a well-formed ACH file, the batch does not exist, an entry does
+                    not fit the batch's service class, or the counts, totals or entry numbers would overflow their fields.
+    """
+    restore_interrupted_append(ach_file_path)
+    with ACHFileReader(ach_file_path) as reader:
+        file_control_index, control_index = locate_controls(reader)
+        if batchNumber is not None and int(reader.record(control_index).field("Batch Number")) != int(batchNumber):
+            batches = [batch for batch in reader.batches() if batch.batchNumber == int(batchNumber)]
+            if not batches:
+                raise ValueError(f"Batch {batchNumber} not found in '{ach_file_path}'.")
+            control_index = batches[0].controlIndex
+
+        batch_control = reader.record(control_index)
+        file_control = reader.record(file_control_index)
+        separator = reader.separator.decode('ascii') or '\r\n'
+        service_class_code = batch_control.field("Service Class Code")
+        batch_number = int(batch_control.field("Batch Number"))
+        originating_dfi = batch_control.field("Originating DFI Identification")
+
+        # New entries continue after both the file's entry count and the batch's last entry number,
+        # so trace numbers stay unique in the file and ascending within the batch
+        next_entry_number = max(int(file_control.field("Entry/Addenda Count")), last_entry_number(reader, control_index)) + 1
+
+        totals = ACHTotals()
+        entries = []
+        for entry_number, record in enumerate(records, start=next_entry_number):
+            if service_class_code == "220" and record['TransactionType'] == 'Debit':
+                raise ValueError(f"Batch {batch_number} is credits only (service class 220); cannot append a debit.")
+            if service_class_code == "225" and record['TransactionType'] != 'Debit':
+                raise ValueError(f"Batch {batch_number} is debits only (service class 225); cannot append a credit.")
+            entries.append(render_record(entry_number, record, originating_dfi, totals))
+        if not entries:
+            return {"appended": 0, "batch": batch_number,
+                    "entries": int(file_control.field("Entry/Addenda Count")), "blocks": int(file_control.field("Block Count"))}
+
+        batch_totals = control_totals(batch_control).merge(totals)
+        file_totals = control_totals(file_control).merge(totals)
+        try:
+            batch_totals.checkFits(MAX_BATCH_ENTRY_COUNT, f"Batch {batch_number}")
+            file_totals.checkFits(MAX_FILE_ENTRY_COUNT, "The file")
+        except ValueError as e:
+            raise ValueError(f"Appending these entries would overflow the control records: {e}")
+        batch_entry_count = batch_totals.entryAddendaCount
+        file_entry_count = file_totals.entryAddendaCount
+
+        new_batch_control = ACH_BatchControlRecord(
+            entryAddendaCount=batch_entry_count,
+            entryHash=str((int(batch_control.field("Entry Hash")) + totals.entryHash) % ENTRY_HASH_MODULUS).zfill(10),
+            totalDebitAmount=str(batch_totals.totalDebitAmount),
+            totalCreditAmount=str(batch_totals.totalCreditAmount),
+            companyId=batch_control.field("Company ID"),
+            originatingBankRoutingNumber=originating_dfi,
+            batchNumber=batch_number,
+            serviceClassCode=service_class_code
+        ).generate()
+
+        # Records between the extended batch and the file control (later batches) move down unchanged
+        tail = reader.mm[(control_index + 1) * reader.stride:file_control_index * reader.stride]
+        line_count = file_control_index + 1 + len(entries)
+        if (line_count + 9) // 10 > MAX_BLOCK_COUNT:
+            raise ValueError(f"Appending these entries would overflow the control records: the file would have more than {MAX_BLOCK_COUNT} blocks of 10.")
+        new_file_control = ACH_FileControlRecord(
+            batchCount=file_control.field("Batch Count"),
+            blockCount=(line_count + 9) // 10,
+            entryAddendaCount=file_entry_count,
+            entryHash=str((int(file_control.field("Entry Hash")) + totals.entryHash) % ENTRY_HASH_MODULUS).zfill(10),
+            totalDebitAmount=str(file_totals.totalDebitAmount),
+            totalCreditAmount=str(file_totals.totalCreditAmount)
+        ).generate()
+        write_offset = control_index * reader.stride
+        original = reader.mm[write_offset:]
+
+    padding = [PADDING_LINE] * ((10 - line_count % 10) % 10)
+    head = separator.join(entries + [new_batch_control, ""]).encode('ascii')
+    end = separator.join([new_file_control] + padding + [""]).encode('ascii')
+
+    write_journal(ach_file_path, write_offset, original)
+    try:
+        with open(ach_file_path, 'r+b') as file:
+            file.seek(write_offset)
+            file.write(head)
+            file.write(tail)
+            file.write(end)
+            file.truncate()
+            file.flush()
+            os.fsync(file.fileno())
+    except BaseException:
+        restore_interrupted_append(ach_file_path)
+        raise
+    os.remove(ach_file_path + JOURNAL_SUFFIX)
+
+    return {
+        "appended"  : len(entries),
+        "batch"     : batch_number,
+        "entries"   : file_entry_count,
+        "blocks"    : (line_count + 9) // 10,
+    }
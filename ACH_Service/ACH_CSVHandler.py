@@ -1,10 +1,129 @@
 import csv, sys, os
 from datetime import datetime
-from PyQt5.QtWidgets import QVBoxLayout, QGridLayout, QLineEdit, QLabel, QHBoxLayout, QPushButton, QComboBox,QRadioButton,QButtonGroup, QFileDialog, QMessageBox
+from operator import mul
 
 # Add the parent directory of the current file to the system path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from ACH_Constant.Constant import GENERIC_CSV_FORMAT, GENERIC_CSV_FORMAT_MANDATORY, XERO_CSV_FORMAT, XERO_CSV_FORMAT_MANDATORY, STANDARD_ENTRY_CLASS_MAPPING
+from ACH_Constant.Constant import GENERIC_CSV_FORMAT, GENERIC_CSV_FORMAT_MANDATORY, XERO_CSV_FORMAT, XERO_CSV_FORMAT_MANDATORY, STANDARD_ENTRY_CLASS_MAPPING, TRANSACTION_DETAILS
+from ACH_Util.Amount import parseCents
+from ACH_Service.ACH_Transaction import row_builder
+
+ROUTING_CHECK_WEIGHTS = (3, 7, 1, 3, 7, 1, 3, 7, 1)  # ABA weights; the weighted digit sum of a valid routing number ends in 0
+
+def validate_row(row_num, row, field_indexes, issues):
+    """
+    Validate the mandatory fields of one parsed CSV row, and check that the whole row is ASCII.
+
+    Args:
+        row_num (int): Row number used in the error messages.
+        row (list): The parsed row values; a value of None counts as missing.
+        field_indexes (list): (field name, column index) pairs of the mandatory fields.
+        issues (list): Validation error messages are appended here.
+
+    Returns:
+        int: The amount in cents, or None if it is missing or invalid.
+    """
+    amount_in_cents = None
+    for field, col_index in field_indexes:
+        value = row[col_index] if col_index is not None and len(row) > col_index else None
+        value = value.strip() if value is not None else ""
+
+        if not value:
+            issues.append(f"Row {row_num}: Missing value for '{field}'")
+        elif field == "Amount":
+            # Parse 'Amount' once into cents; it must be > 0 with at most 2 decimal places
+            try:
+                amount_in_cents = parseCents(value)
+                if amount_in_cents <= 0:
+                    issues.append(f"Row {row_num}: 'Amount' must be greater than 0.")
+            except ValueError:
+                issues.append(f"Row {row_num}: 'Amount' must be a valid numeric value with at most 2 decimal places.")
+
+    # Every ACH record is 94 bytes of ASCII; accented or other non-ASCII letters would not fit
+    if not "".join(filter(None, row)).isascii():
+        issues.append(f"Row {row_num}: Only ASCII characters can be written to an ACH file; replace accented or special characters.")
+    return amount_in_cents
+
+def validate_routing(row_num, routingNumber, routingDirectory, issues):
+    """
+    Check a receiver routing number: 9 digits whose last digit is the ABA check digit of the
+    first 8 and, if a FedACH routing directory is loaded, a known and active participant.
+
+    Args:
+        row_num (int): Row number used in the error messages.
+        routingNumber (str): The receiver routing number.
+        routingDirectory (RoutingDirectory): The loaded directory, or None to check only the format.
+        issues (list): Validation error messages are appended here.
+    """
+    if len(routingNumber) != 9 or not routingNumber.isascii() or not routingNumber.isdigit():
+        issues.append(f"Row {row_num}: Routing number '{routingNumber}' must be 9 digits.")
+    elif sum(map(mul, map(int, routingNumber), ROUTING_CHECK_WEIGHTS)) % 10:
+        issues.append(f"Row {row_num}: Routing number '{routingNumber}' has an invalid check digit.")
+    elif routingDirectory is not None:
+        reason = routingDirectory.check(routingNumber)
+        if reason:
+            issues.append(f"Row {row_num}: {reason}")
+
+def validate_transaction_type(row_num, transactionType, issues):
+    """
+    Check the 'Transaction Type' of a row, which selects the transaction code of the entry.
+
+    Args:
+        row_num (int): Row number used in the error messages.
+        transactionType (str): The transaction type, e.g. 'Credit'.
+        issues (list): Validation error messages are appended here.
+    """
+    if transactionType not in TRANSACTION_DETAILS["Transaction Type"]:
+        issues.append(f"Row {row_num}: 'Transaction Type' must be 'Credit' or 'Debit', not '{transactionType}'.")
+
+def validate_transaction(row_num, transaction, routingDirectory, issues):
+    """
+    Validate one transaction dictionary (e.g. a JSON transaction, or a row read by read_csv_data)
+    with the same rules as a CSV upload: mandatory fields, amount, routing number, transaction type
+    and ASCII text. Transactions with 'Receiver Bank Details' are checked as XERO rows, the others
+    as generic rows; their optional fields (TRANSACTION_DETAILS) must be text as well.
+
+    Args:
+        row_num (int): Row number used in the error messages.
+        transaction (dict): The transaction details.
+        routingDirectory (RoutingDirectory): Optional FedACH directory to reject unknown or inactive routing numbers.
+        issues (list): Validation error messages are appended here.
+
+    Returns:
+        int: The amount in cents, or None if the transaction is invalid.
+    """
+    xero = "Receiver Bank Details" in transaction
+    mandatory_fields = XERO_CSV_FORMAT_MANDATORY if xero else GENERIC_CSV_FORMAT_MANDATORY
+    row = []
+    issue_count = len(issues)
+    for field in mandatory_fields:
+        value = transaction.get(field)
+        if value is None:
+            value = ""
+        elif field == "Amount" and isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)  # JSON amounts may be numbers
+        elif not isinstance(value, str):
+            issues.append(f"Row {row_num}: '{field}' must be text.")
+            value = ""
+        row.append(value)
+    for field in TRANSACTION_DETAILS:
+        value = transaction.get(field)
+        if field in mandatory_fields or value is None:
+            continue
+        if not isinstance(value, str):
+            issues.append(f"Row {row_num}: '{field}' must be text.")
+        elif not value.isascii():
+            issues.append(f"Row {row_num}: '{field}' must be ASCII text; replace accented or special characters.")
+    if len(issues) > issue_count:
+        return None
+    validate_transaction_type(row_num, transaction.get("Transaction Type", "Credit"), issues)
+
+    amount_in_cents = validate_row(row_num, row, list(zip(mandatory_fields, range(len(row)))), issues)
+    if len(issues) == issue_count:
+        routing_number = transaction["Receiver Bank Details"].strip()[:9] if xero else transaction["Receiver Routing Number"].strip()
+        validate_routing(row_num, routing_number, routingDirectory, issues)
+    return amount_in_cents if len(issues) == issue_count else None
+
 
 def validate_xero_csv(file_path):
     """
@@ -25,20 +144,9 @@ def validate_xero_csv(file_path):
         reader = csv.reader(file, delimiter=',')
 
         # Validate rows (No headers, assume column order matches expected_columns)
+        field_indexes = [(field, index) for index, field in enumerate(mandatory_columns)]
         for row_num, row in enumerate(reader, start=1):  # No header, start at 1
-            for index, field in enumerate(mandatory_columns):
-                value = row[index].strip() if len(row) > index else ""
-
-                if not value:
-                    issues.append(f"Row {row_num}: Missing value for '{field}'")
-                elif field == "Amount":
-                    # Validate 'Amount' as a numeric value > 0
-                    try:
-                        amount = float(value)
-                        if amount <= 0:
-                            issues.append(f"Row {row_num}: 'Amount' must be greater than 0.")
-                    except ValueError:
-                        issues.append(f"Row {row_num}: 'Amount' must be a valid numeric value.")
+            validate_row(row_num, row, field_indexes, issues)
     return issues
 
 
@@ -75,21 +183,9 @@ def validate_generic_csv(file_path):
         header_mapping = {header: index for index, header in enumerate(headers)}
 
         # Validate rows
+        field_indexes = [(field, header_mapping.get(field)) for field in mandatory_fields]
         for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
-            for field in mandatory_fields:
-                col_index = header_mapping.get(field)
-                value = row[col_index].strip() if col_index is not None and len(row) > col_index else ""
-
-                if not value:
-                    issues.append(f"Row {row_num}: Missing value for '{field}'")
-                elif field == "Amount":
-                    # Validate 'Amount' as a numeric value > 0
-                    try:
-                        amount = float(value)
-                        if amount <= 0:
-                            issues.append(f"Row {row_num}: 'Amount' must be greater than 0.")
-                    except ValueError:
-                        issues.append(f"Row {row_num}: 'Amount' must be a valid numeric value.")
+            validate_row(row_num, row, field_indexes, issues)
     return issues
 
 
@@ -175,3 +271,161 @@ def read_csv_data(accountingSystem, file_path):
         return read_xero_csv(file_path)
     else:
         return read_generic_csv(file_path)
+
+
+def iter_xero_rows(file_path, routingDirectory, issues):
+    """
+    Validate a XERO CSV file row by row.
+    Assumes that the file does not contain headers and follows the column order defined in XERO_CSV_FORMAT.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        routingDirectory (RoutingDirectory): Optional FedACH directory to reject unknown or inactive routing numbers.
+        issues (list): Validation error messages are appended here.
+
+    Yields:
+        tuple: (columns, row, amount in cents) for each valid row.
+    """
+    field_indexes = [(field, index) for index, field in enumerate(XERO_CSV_FORMAT_MANDATORY)]
+    bank_details_index = XERO_CSV_FORMAT.index("Receiver Bank Details")
+
+    with open(file_path, mode="r", encoding="utf-8") as file:
+        reader = csv.reader(file, delimiter=',')
+        for row_num, row in enumerate(reader, start=1):  # No header, start at 1
+            issue_count = len(issues)
+            amount_in_cents = validate_row(row_num, row, field_indexes, issues)
+            if len(issues) == issue_count:
+                # The routing number is the first 9 digits of the bank details
+                validate_routing(row_num, row[bank_details_index].strip()[:9], routingDirectory, issues)
+            if len(issues) == issue_count:
+                yield XERO_CSV_FORMAT, row, amount_in_cents
+
+
+def iter_generic_rows(file_path, routingDirectory, issues):
+    """
+    Validate a generic CSV file with headers row by row.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        routingDirectory (RoutingDirectory): Optional FedACH directory to reject unknown or inactive routing numbers.
+        issues (list): Validation error messages are appended here.
+
+    Yields:
+        tuple: (columns, row, amount in cents) for each valid row; columns are the file's headers.
+    """
+    with open(file_path, mode="r", encoding="utf-8") as file:
+        reader = csv.reader(file, delimiter=',')
+        headers = next(reader, None)
+
+        # Check for headers
+        if not headers:
+            issues.append("File is empty or missing headers.")
+            return
+
+        # Validate headers
+        missing_headers = [field for field in GENERIC_CSV_FORMAT_MANDATORY if field not in headers]
+        if missing_headers:
+            issues.append(f"Missing mandatory headers: {', '.join(missing_headers)}")
+
+        header_mapping = {header: index for index, header in enumerate(headers)}
+        field_indexes = [(field, header_mapping.get(field)) for field in GENERIC_CSV_FORMAT_MANDATORY]
+        routing_index = header_mapping.get("Receiver Routing Number")
+        type_index = header_mapping.get("Transaction Type")
+        for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
+            issue_count = len(issues)
+            amount_in_cents = validate_row(row_num, row, field_indexes, issues)
+            if type_index is not None and len(row) > type_index:
+                validate_transaction_type(row_num, row[type_index], issues)
+            if len(issues) == issue_count:
+                validate_routing(row_num, row[routing_index].strip(), routingDirectory, issues)
+            if len(issues) == issue_count:
+                yield headers, row, amount_in_cents
+
+
+def load_xero_csv(file_path, routingDirectory=None):
+    """
+    Validate and read a XERO CSV file in a single pass.
+    Assumes that the file does not contain headers and follows the column order defined in XERO_CSV_FORMAT.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        routingDirectory (RoutingDirectory): Optional FedACH directory to reject unknown or inactive routing numbers.
+
+    Returns:
+        tuple: (rows, issues) where rows is a list of dictionaries for the valid rows, each with the
+               parsed amount under "Amount In Cents", and issues is a list of validation error messages.
+    """
+    rows = []
+    issues = []
+    for columns, row, amount_in_cents in iter_xero_rows(file_path, routingDirectory, issues):
+        row_dict = {column: row[index] if index < len(row) else "" for index, column in enumerate(columns)}
+        row_dict["Amount In Cents"] = amount_in_cents
+        rows.append(row_dict)
+    return rows, issues
+
+
+def load_generic_csv(file_path, routingDirectory=None):
+    """
+    Validate and read a generic CSV file with headers in a single pass.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        routingDirectory (RoutingDirectory): Optional FedACH directory to reject unknown or inactive routing numbers.
+
+    Returns:
+        tuple: (rows, issues) where rows is a list of dictionaries for the valid rows, each with the
+               parsed amount under "Amount In Cents", and issues is a list of validation error messages.
+    """
+    rows = []
+    issues = []
+    for columns, row, amount_in_cents in iter_generic_rows(file_path, routingDirectory, issues):
+        row_dict = dict(zip(columns, row))
+        row_dict["Amount In Cents"] = amount_in_cents
+        rows.append(row_dict)
+    return rows, issues
+
+
+def load_transactions(accountingSystem, file_path, originator, routingDirectory=None):
+    """
+    Validate a CSV file and build its transaction records directly, without a dictionary per row.
+
+    Args:
+        accountingSystem (str): 'Xero' or 'Default'.
+        file_path (str): Path to the CSV file.
+        originator (ACHOriginator): Company-level fields shared by every transaction.
+        routingDirectory (RoutingDirectory): Optional FedACH directory to reject unknown or inactive routing numbers.
+
+    Returns:
+        tuple: (transactions, issues) - ACHTransaction records for the valid rows and the list of validation error messages.
+    """
+    issues = []
+    if accountingSystem == 'Xero':
+        rows = iter_xero_rows(file_path, routingDirectory, issues)
+    else:
+        rows = iter_generic_rows(file_path, routingDirectory, issues)
+
+    transactions = []
+    build = None
+    for columns, row, amount_in_cents in rows:
+        if build is None:
+            build = row_builder(columns, originator)
+        transactions.append(build(row, amount_in_cents))
+    return transactions, issues
+
+
+def load_csv(accountingSystem, file_path, routingDirectory=None):
+    """
+    Validate and read a CSV file in a single pass, based on the accounting system.
+    Use this instead of calling validate_csv and read_csv_data on the same file.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        routingDirectory (RoutingDirectory): Optional FedACH directory to reject unknown or inactive routing numbers.
+
+    Returns:
+        tuple: (rows, issues) - the validated, typed rows and the list of validation error messages.
+    """
+    if accountingSystem == 'Xero':
+        return load_xero_csv(file_path, routingDirectory)
+    else:
+        return load_generic_csv(file_path, routingDirectory)
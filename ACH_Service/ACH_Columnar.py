@@ -0,0 +1,196 @@
+import os, sys
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only the columnar backend needs it
+    np = None
+
+# Add the parent directory of the current file to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ACH_Service.ACH_Generator import ENTRY_NUMBER_RANGE_MESSAGE, MAX_ENTRY_NUMBER, render_chunk, write_chunk
+from ACH_Service.ACH_Totals import ACHTotals
+from ACH_Util.Amount import AMOUNT_RANGE_MESSAGE, MAX_AMOUNT_CENTS, toCents
+
+RECORD_LENGTH = 94
+CREDIT_TRANSACTION_CODE = 22
+DEBIT_TRANSACTION_CODE = 27
+CHECK_DIGIT_WEIGHTS = [3, 7, 1, 3, 7, 1, 3, 7]
+DIGIT_POWERS_8 = [10 ** power for power in range(7, -1, -1)]
+
+def require_numpy():
+    if np is None:
+        raise ImportError("The columnar backend requires NumPy. Install it with 'pip install numpy'.")
+
+def digit_columns(values, width):
+    """ASCII digit columns (n x width, uint8) of non-negative integers, left-padded with '0'."""
+    powers = np.array([10 ** power for power in range(width - 1, -1, -1)], dtype=np.int64)
+    return ((values[:, None] // powers) % 10 + ord('0')).astype(np.uint8)
+
+def text_columns(values, width):
+    """
+    Upper-cased ASCII columns (n x width, uint8) of strings, truncated to width and right-padded with blanks,
+    the same way RecordLayout formats a right-padded text field.
+    """
+    encoded = np.char.upper(np.asarray(values, dtype=str)).astype(f'S{width}')
+    columns = encoded.view(np.uint8).reshape(len(encoded), width).copy()
+    columns[columns == 0] = ord(' ')
+    return columns
+
+
+class ACHColumnarBatch:
+    """
+    Entries of a batch held column by column instead of as one payload dict per row:
+    amounts as int64 cents, routing numbers as fixed-width digit arrays and text fields
+    as fixed-width byte arrays. Check digits, entry hash and totals are computed over
+    whole columns, and rendering fills a preallocated fixed-width byte buffer.
+    """
+
+    def __init__(self, transactionCodes, routingDigits, routingLengths, accountNumbers, amounts, transactionIdentifiers, receiverNames):
+        """
+        :param transactionCodes: uint8 array of transaction codes (22 = Credit, 27 = Debit).
+        :param routingDigits: uint8 array (n x 9) of routing number digit values, left-aligned.
+        :param routingLengths: uint8 array of routing number lengths (8 or 9).
+        :param accountNumbers: uint8 array (n x 17) of the rendered account number field.
+        :param amounts: int64 array of amounts in cents.
+        :param transactionIdentifiers: uint8 array (n x 15) of the rendered transaction identifier field.
+        :param receiverNames: uint8 array (n x 22) of the rendered receiver name field.
+        """
+        require_numpy()
+        self.transactionCodes       = transactionCodes
+        self.routingDigits          = routingDigits
+        self.routingLengths         = routingLengths
+        self.accountNumbers         = accountNumbers
+        self.amounts                = amounts
+        self.transactionIdentifiers = transactionIdentifiers
+        self.receiverNames          = receiverNames
+
+    def __len__(self):
+        return len(self.amounts)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build the columns from payload records (the dicts produced by preparePayload).
+        :raises ValueError: On an unknown transaction type, a routing number that is not
+                            8 or 9 digits, or an amount that does not fit the amount field.
+        :raises UnicodeEncodeError: On a text field with non-ASCII characters.
+        """
+        require_numpy()
+        transaction_types = [record['TransactionType'] for record in records]
+        if any(transaction_type not in ('Credit', 'Debit') for transaction_type in transaction_types):
+            raise ValueError("Transaction Type must be 'Credit' or 'Debit'.")
+        transaction_codes = np.where(np.asarray(transaction_types) == 'Debit', DEBIT_TRANSACTION_CODE, CREDIT_TRANSACTION_CODE).astype(np.uint8)
+
+        routing = np.asarray([record['ReceivingDFI'] for record in records], dtype=str)
+        routing_lengths = np.char.str_len(routing)
+        routing_digits = routing.astype('S9').view(np.uint8).reshape(len(routing), 9).astype(np.int16) - ord('0')
+        routing_digits[routing_digits == -ord('0')] = 0  # Null padding of 8-digit routing numbers
+        if (not np.all((routing_lengths == 8) | (routing_lengths == 9))
+                or np.any((routing_digits < 0) | (routing_digits > 9))):
+            raise ValueError("Routing number must be 8 or 9 digits.")
+
+        amounts = np.asarray([
+            record['AmountInCents'] if record.get('AmountInCents') is not None else toCents(record['Amount'])
+            for record in records
+        ], dtype=np.int64)
+        if np.any((amounts < 0) | (amounts > MAX_AMOUNT_CENTS)):
+            raise ValueError(AMOUNT_RANGE_MESSAGE)
+
+        return cls(
+            transaction_codes,
+            routing_digits.astype(np.uint8),
+            routing_lengths.astype(np.uint8),
+            text_columns([record['ReceivingBankAccountNumber'] for record in records], 17),
+            amounts,
+            text_columns([record['TransactionIdentifier'] for record in records], 15),
+            text_columns([record['ReceiverName'] for record in records], 22),
+        )
+
+    def check_digits(self):
+        """Check digit of every routing number: the 9th digit if present, otherwise calculated from the first 8."""
+        calculated = (10 - (self.routingDigits[:, :8].astype(np.int64) @ np.array(CHECK_DIGIT_WEIGHTS)) % 10) % 10
+        return np.where(self.routingLengths == 9, self.routingDigits[:, 8], calculated).astype(np.uint8)
+
+    def totals(self):
+        """Control totals of the batch as ACHTotals, computed over whole columns."""
+        totals = ACHTotals()
+        debits = self.transactionCodes == DEBIT_TRANSACTION_CODE
+        totals.entryAddendaCount    = len(self)
+        totals.entryHash            = int((self.routingDigits[:, :8].astype(np.int64) @ np.array(DIGIT_POWERS_8)).sum())
+        totals.totalDebitAmount     = int(self.amounts[debits].sum())
+        totals.totalCreditAmount    = int(self.amounts[~debits].sum())
+        return totals
+
+    def render(self, originatingDFI, entryNumbers, out=None, separator=b'\r\n'):
+        """
+        Render the Entry Detail records into a fixed-width byte buffer.
+
+        :param originatingDFI: Originating bank routing number; the first 8 digits go into the trace numbers.
+        :param entryNumbers: int64 array of entry numbers, one per entry, at most 9999999.
+        :param out: Optional preallocated uint8 array of shape (n, 94 + len(separator)) to render into,
+                    e.g. a view over a memory-mapped output file.
+        :param separator: Line separator written after each record.
+        :return: The filled uint8 buffer; ``out.tobytes()`` is the text of the records.
+        :raises ValueError: If an entry number does not fit the 7-digit entry number field.
+        """
+        entryNumbers = np.asarray(entryNumbers, dtype=np.int64)
+        if entryNumbers.size and entryNumbers.max() > MAX_ENTRY_NUMBER:
+            raise ValueError(ENTRY_NUMBER_RANGE_MESSAGE)
+        count = len(self)
+        stride = RECORD_LENGTH + len(separator)
+        if out is None:
+            out = np.empty((count, stride), dtype=np.uint8)
+
+        out[:, 0]       = ord('6')
+        out[:, 1:3]     = digit_columns(self.transactionCodes.astype(np.int64), 2)
+        out[:, 3:11]    = self.routingDigits[:, :8] + ord('0')
+        out[:, 11]      = self.check_digits() + ord('0')
+        out[:, 12:29]   = self.accountNumbers
+        out[:, 29:39]   = digit_columns(self.amounts, 10)
+        out[:, 39:54]   = self.transactionIdentifiers
+        out[:, 54:76]   = self.receiverNames
+        out[:, 76:78]   = ord(' ')                                  # Discretionary Data
+        out[:, 78]      = ord('0')                                  # Addenda Record Indicator
+        out[:, 79:87]   = np.frombuffer(str(originatingDFI)[:8].rjust(8, '0').encode('ascii'), dtype=np.uint8)
+        out[:, 87:94]   = digit_columns(entryNumbers, 7)
+        if separator:
+            out[:, RECORD_LENGTH:] = np.frombuffer(separator, dtype=np.uint8)
+        return out
+
+
+def render_chunk_columnar(numberedRecords, originatingDFI):
+    """
+    Columnar counterpart of ACH_Generator.render_chunk: render a chunk of (entry number, record)
+    pairs with vectorised check digits, totals and formatting.
+
+    Chunks with non-ASCII text, which the fixed-width byte columns cannot hold, go through
+    the row renderer instead, which rejects them the same way as render_chunk.
+
+    :return: (rendered entries as text, each followed by '\\r\\n'; partial ACHTotals of the chunk)
+    """
+    try:
+        batch = ACHColumnarBatch.from_records([record for _, record in numberedRecords])
+    except UnicodeEncodeError:
+        return render_chunk(numberedRecords, originatingDFI)
+    entry_numbers = np.fromiter((entry_number for entry_number, _ in numberedRecords), dtype=np.int64, count=len(numberedRecords))
+    return batch.render(originatingDFI, entry_numbers).tobytes().decode('ascii'), batch.totals()
+
+def write_chunk_columnar(mapped, offset, numberedRecords, originatingDFI):
+    """
+    Columnar counterpart of ACH_Generator.write_chunk: render a chunk of (entry number, record)
+    pairs directly into a memory-mapped output file, using the mapped bytes as the render buffer.
+
+    Chunks with non-ASCII text go through the row writer, which rejects them the same way.
+
+    :return: Partial ACHTotals of the chunk.
+    """
+    try:
+        batch = ACHColumnarBatch.from_records([record for _, record in numberedRecords])
+    except UnicodeEncodeError:
+        return write_chunk(mapped, offset, numberedRecords, originatingDFI)
+    entry_numbers = np.fromiter((entry_number for entry_number, _ in numberedRecords), dtype=np.int64, count=len(numberedRecords))
+    stride = RECORD_LENGTH + 2
+    out = np.frombuffer(mapped, dtype=np.uint8, count=len(batch) * stride, offset=offset).reshape(len(batch), stride)
+    batch.render(originatingDFI, entry_numbers, out=out)
+    del out  # Release the view so the mapping can be closed
+    return batch.totals()
@@ -0,0 +1,145 @@
+import csv, glob, json, os, sys, time
+from datetime import datetime
+
+# Add the parent directory of the current file to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ACH_Service.ACH_Generator import ACHFileGenerator
+from ACH_Service.ACH_RoutingDirectory import RoutingDirectory
+
+_routing_directory = None  # Loaded once per worker process by load_worker_routing_directory
+
+def convert_csv_file(csv_file_path, ach_file_path, workers=1, routingDirectory=None, instrumentation=None, mapped=False, duplicateIndex=None,
+                     receiverCache=None):
+    """
+    Stream one payload CSV straight through entry rendering into an ACH file.
+    Rows are read lazily and control records come from running totals, so memory stays
+    bounded regardless of the number of rows. A partially written ACH file is removed on failure.
+
+    Args:
+        csv_file_path (str): Path to the payload CSV file.
+        ach_file_path (str): Path of the ACH file to write.
+        workers (int): Number of worker processes rendering entries.
+        routingDirectory (RoutingDirectory): Optional FedACH directory to reject unknown or inactive routing numbers.
+        instrumentation (Instrumentation): Optional per-stage timings and counters.
+        mapped (bool): Write through a preallocated memory-mapped file (ACHFileGenerator.write_mapped)
+                       instead of streaming; faster for large files, but the rows are held in memory.
+        duplicateIndex (DuplicateIndex): Optional index of earlier files; payments already sent within its window are rejected.
+        receiverCache (ReceiverSegmentCache): Optional cache of pre-rendered segments of recurring receivers.
+
+    Returns:
+        dict: Entry count, batch count, debit/credit totals in cents and entry hash of the file.
+    """
+    try:
+        with open(csv_file_path, mode='r', newline='') as csv_file:
+            reader = csv.DictReader(csv_file, delimiter=',')
+            if instrumentation is not None:
+                reader = instrumentation.iterate("CSV parse", reader)
+            ach_generator = ACHFileGenerator(reader, workers=workers, routingDirectory=routingDirectory, instrumentation=instrumentation,
+                                             duplicateIndex=duplicateIndex, receiverCache=receiverCache)
+            if mapped:
+                ach_generator.write_mapped(ach_file_path)
+            else:
+                with open(ach_file_path, 'w', newline='') as ach_file:
+                    ach_generator.generate_to(ach_file)
+    except BaseException:
+        # Do not leave a partially written ACH file behind
+        if os.path.exists(ach_file_path):
+            os.remove(ach_file_path)
+        raise
+    return file_summary(ach_generator)
+
+def file_summary(achGenerator):
+    """Entry count, batch count, debit/credit totals in cents and entry hash of a generated file."""
+    totals = achGenerator.totals
+    return {
+        "entries"               : totals.entryAddendaCount,
+        "batches"               : achGenerator.batchCount,
+        "total_debit_cents"     : totals.totalDebitAmount,
+        "total_credit_cents"    : totals.totalCreditAmount,
+        "entry_hash"            : totals.formattedEntryHash(),
+    }
+
+def find_csv_files(target):
+    """CSV files of a directory, or matching a glob pattern, in sorted order."""
+    pattern = os.path.join(target, '*.csv') if os.path.isdir(target) else target
+    return sorted(path for path in glob.glob(pattern) if path.endswith('.csv') and os.path.isfile(path))
+
+def ach_file_path_for(csv_file_path, timestamp):
+    """ACH output path next to its input: <csv name>_<timestamp>.txt."""
+    stem = os.path.splitext(os.path.basename(csv_file_path))[0]
+    return os.path.join(os.path.dirname(csv_file_path), f"{stem}_{timestamp}.txt")
+
+def load_worker_routing_directory(routingDirectoryPath):
+    """Process pool initializer: load the routing directory once per worker instead of once per file."""
+    global _routing_directory
+    _routing_directory = RoutingDirectory.load(routingDirectoryPath) if routingDirectoryPath else None
+
+def convert_one(csv_file_path, ach_file_path):
+    """
+    Convert one file of a directory run. Any error of the file, whatever its type, is reported
+    in the result rather than raised, so one bad file cannot abort the run or its manifest.
+    """
+    start = time.perf_counter()
+    result = {"input": csv_file_path, "output": ach_file_path}
+    try:
+        result.update(convert_csv_file(csv_file_path, ach_file_path, routingDirectory=_routing_directory))
+        result["status"] = "ok"
+    except Exception as e:
+        result["output"] = None
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = round(time.perf_counter() - start, 6)
+    return result
+
+def convert_directory(target, workers=1, routingDirectoryPath=None, manifestPath=None):
+    """
+    Convert every CSV of a directory (or glob pattern) in a bounded pool of worker processes.
+    Each ACH file is written next to its input, and one JSON manifest lists the outputs,
+    counts, totals and failures of the run.
+
+    Args:
+        target (str): Directory containing the CSV files, or a glob pattern such as 'drop/*_eod.csv'.
+        workers (int): Number of files converted at the same time; 1 converts them in this process.
+        routingDirectoryPath (str): Optional FedACH directory file, loaded once per worker.
+        manifestPath (str): Where to write the manifest; defaults to ach_manifest_<timestamp>.json
+                            in the target directory (or the directory of the glob pattern).
+
+    Returns:
+        dict: The manifest.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    csv_file_paths = find_csv_files(target)
+    ach_file_paths = [ach_file_path_for(path, timestamp) for path in csv_file_paths]
+    start = time.perf_counter()
+
+    if workers > 1 and len(csv_file_paths) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, initializer=load_worker_routing_directory, initargs=(routingDirectoryPath,)) as executor:
+            # Hand files out in small groups; per-task overhead matters when the files are small
+            chunk_size = max(1, len(csv_file_paths) // (workers * 4))
+            results = list(executor.map(convert_one, csv_file_paths, ach_file_paths, chunksize=chunk_size))
+    else:
+        load_worker_routing_directory(routingDirectoryPath)
+        results = [convert_one(csv_path, ach_path) for csv_path, ach_path in zip(csv_file_paths, ach_file_paths)]
+
+    succeeded = [result for result in results if result["status"] == "ok"]
+    manifest = {
+        "target"                : target,
+        "created"               : timestamp,
+        "seconds"               : round(time.perf_counter() - start, 6),
+        "files"                 : len(results),
+        "succeeded"             : len(succeeded),
+        "failed"                : len(results) - len(succeeded),
+        "entries"               : sum(result["entries"] for result in succeeded),
+        "total_debit_cents"     : sum(result["total_debit_cents"] for result in succeeded),
+        "total_credit_cents"    : sum(result["total_credit_cents"] for result in succeeded),
+        "results"               : results,
+    }
+
+    if manifestPath is None:
+        manifest_directory = target if os.path.isdir(target) else os.path.dirname(target)
+        manifestPath = os.path.join(manifest_directory, f"ach_manifest_{timestamp}.json")
+    with open(manifestPath, 'w') as file:
+        json.dump(manifest, file, indent=4)
+    manifest["manifest"] = manifestPath
+    return manifest
@@ -0,0 +1,163 @@
+import json, os, sys, sqlite3, time, logging
+from array import array
+from datetime import datetime
+from hashlib import blake2b
+
+# Add the parent directory of the current file to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ACH_Util.Amount import toCents
+from ACH_Util.Logger import getLogger, logEvent
+
+logger = getLogger("duplicate_index")
+
+DEFAULT_WINDOW_DAYS = 30
+LOOKUP_BATCH_SIZE = 10000       # Entries looked up per query
+MAX_REPORTED_DUPLICATES = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id          INTEGER PRIMARY KEY,
+    name        TEXT NOT NULL,
+    created     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    key         INTEGER NOT NULL,
+    file_id     INTEGER NOT NULL,
+    PRIMARY KEY (key, file_id)
+) WITHOUT ROWID;
+"""
+
+def entry_key(record):
+    """
+    64-bit key of a payment: receiving routing number, account number, amount in cents and
+    transaction identifier. Two entries with the same key are treated as the same payment.
+    """
+    amount_in_cents = record.get('AmountInCents')
+    if amount_in_cents is None:
+        amount_in_cents = toCents(record['Amount'])
+    payment = f"{record['ReceivingDFI'].strip()}|{record['ReceivingBankAccountNumber'].strip()}|{amount_in_cents}|{record['TransactionIdentifier'].strip()}"
+    return int.from_bytes(blake2b(payment.encode(), digest_size=8).digest(), 'little', signed=True)
+
+
+class DuplicateIndex:
+    """
+    On-disk (SQLite) index of the entries of previously generated ACH files, used to reject
+    a payment that was already sent within a rolling window, e.g. when a CSV is uploaded twice.
+
+    Each entry is stored as a 64-bit key (see entry_key) in a clustered table, so looking up
+    a batch of entries is one indexed join. Files older than the window are no longer matched
+    and are pruned when the index is opened.
+    """
+
+    def __init__(self, path, windowDays=DEFAULT_WINDOW_DAYS):
+        """
+        :param path: Path of the SQLite index file; created on first use.
+        :param windowDays: Entries of files generated within this many days are checked.
+        """
+        self.path       = path
+        self.windowDays = windowDays
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.prune()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def cutoff(self):
+        """Creation time before which files fall outside the window."""
+        return time.time() - self.windowDays * 86400
+
+    def prune(self):
+        """Remove the entries of files that fell outside the window."""
+        with self.connection:
+            cutoff = self.cutoff()
+            expired = self.connection.execute("SELECT COUNT(*) FROM files WHERE created < ?", (cutoff,)).fetchone()[0]
+            if expired:
+                # One pass over the entries, only on the runs where files actually expire
+                self.connection.execute("DELETE FROM entries WHERE file_id IN (SELECT id FROM files WHERE created < ?)", (cutoff,))
+                self.connection.execute("DELETE FROM files WHERE created < ?", (cutoff,))
+                logEvent(logger, logging.INFO, "duplicate_index_pruned", path=self.path, files=expired)
+
+    def lookup(self, keys):
+        """
+        Find which keys belong to entries of files within the window.
+        :param keys: Entry keys to look up (any number; sent to SQLite in one batch).
+        :return: Dictionary of matched key -> (file name, creation time) of the earliest matching file.
+        """
+        # The keys go in as one JSON array parameter rather than one bound row each. CROSS JOIN
+        # pins the join order, so the entries are searched by key rather than scanned.
+        rows = self.connection.execute(
+            "SELECT entries.key, files.name, files.created FROM json_each(?) AS probe "
+            "CROSS JOIN entries ON entries.key = probe.value CROSS JOIN files ON files.id = entries.file_id "
+            "WHERE files.created >= ? ORDER BY files.created DESC",
+            (json.dumps(sorted(keys)), self.cutoff())
+        ).fetchall()
+        return {key: (name, created) for key, name, created in rows}
+
+    def record(self, fileName, keys):
+        """
+        Add the entries of a generated file to the index.
+        :param fileName: Name or path of the ACH file, reported when a later entry matches.
+        :param keys: Entry keys of the file (see entry_key).
+        """
+        with self.connection:
+            file_id = self.connection.execute("INSERT INTO files (name, created) VALUES (?, ?)", (fileName, time.time())).lastrowid
+            # Sorted, so the inserts walk the key order of the table instead of touching random pages
+            self.connection.executemany("INSERT OR IGNORE INTO entries (key, file_id) VALUES (?, ?)", ((key, file_id) for key in sorted(keys)))
+
+    def checker(self):
+        """A DuplicateCheck collecting the entries of one file being generated."""
+        return DuplicateCheck(self)
+
+
+class DuplicateCheck:
+    """
+    Entries of one file being generated, looked up against the index in batches of
+    LOOKUP_BATCH_SIZE as they are added, and recorded once the file has been written.
+    """
+
+    def __init__(self, index):
+        self.index      = index
+        self.keys       = array("q")    # Keys of every entry of the file
+        self.pending    = []            # (entry number, key) pairs not yet looked up
+
+    def add(self, entryNumber, record):
+        """
+        Add an entry of the file.
+        :raises ValueError: When a looked up entry matches an earlier file within the window.
+        """
+        key = entry_key(record)
+        self.keys.append(key)
+        self.pending.append((entryNumber, key))
+        if len(self.pending) >= LOOKUP_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """
+        Look up the pending entries.
+        :raises ValueError: Listing the first duplicates found and the files they match.
+        """
+        pending, self.pending = self.pending, []
+        if not pending:
+            return
+        matches = self.index.lookup([key for _, key in pending])
+        duplicates = [(entry_number, matches[key]) for entry_number, key in pending if key in matches]
+        if duplicates:
+            details = "; ".join(
+                f"entry {entry_number} matches '{name}' ({datetime.fromtimestamp(created).strftime('%Y-%m-%d %H:%M')})"
+                for entry_number, (name, created) in duplicates[:MAX_REPORTED_DUPLICATES]
+            )
+            more = f" (and {len(duplicates) - MAX_REPORTED_DUPLICATES} more)" if len(duplicates) > MAX_REPORTED_DUPLICATES else ""
+            raise ValueError(f"Duplicate payments already sent within {self.index.windowDays:g} days: {details}{more}")
+
+    def record(self, fileName):
+        """Record the file's entries in the index, once it has been written."""
+        self.index.record(fileName, self.keys)
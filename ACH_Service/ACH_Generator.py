@@ -1,4 +1,9 @@
-import os, sys
+import io, mmap, os, sys, time
+import tempfile
+from collections import deque
+from functools import partial
+from itertools import chain, islice
+from operator import attrgetter
 
 # Add the parent directory of the current file to the system path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -7,118 +12,582 @@ from ACH_FileFormat.ACH_2BatchHeader import ACH_BatchHeader
 from ACH_FileFormat.ACH_3EntryDetail import ACH_EntryDetail
 from ACH_FileFormat.ACH_5BatchControlRecord import ACH_BatchControlRecord
 from ACH_FileFormat.ACH_6FileControlRecord import ACH_FileControlRecord
+from ACH_Service.ACH_Totals import ACHTotals, MAX_BATCH_COUNT, MAX_BATCH_ENTRY_COUNT, MAX_BLOCK_COUNT, MAX_FILE_ENTRY_COUNT
+from ACH_Service.ACH_Transaction import ACHTransaction
+from ACH_Util.Amount import AMOUNT_RANGE_MESSAGE, MAX_AMOUNT_CENTS, toCents
+
+LINE_SEPARATOR = '\r\n'
+RECORD_LENGTH = 94
+RECORD_STRIDE = RECORD_LENGTH + len(LINE_SEPARATOR)  # Bytes per line of the file, separator included
+PADDING_LINE = '9' * RECORD_LENGTH  # Fixed-width block padding record
+SPOOL_MAX_SIZE = 16 * 1024 * 1024  # Rendered entries per batch kept in memory before spilling to disk
+ENTRY_CHUNK_SIZE = 10000  # Entries per worker task when rendering in a process pool
+WRITE_BLOCK_LINES = 1000  # Lines per measured write when the generator is instrumented
+MAX_ENTRY_NUMBER = 10 ** 7 - 1  # Width of the Entry Number, the last 7 digits of the trace number
+ENTRY_NUMBER_RANGE_MESSAGE = f"A file can hold at most {MAX_ENTRY_NUMBER} entries: the entry number in the trace number has 7 digits."
+
+# Fields of an ACHTransaction read in one C-level call each, instead of one __getitem__ per field
+TRANSACTION_BATCH_FIELDS = attrgetter('StandardEntryClassCode', 'EffectiveEntryDate', 'originator.CompanyId', 'TransactionType')
+TRANSACTION_ENTRY_FIELDS = attrgetter(
+    'TransactionType', 'ReceivingDFI', 'ReceivingBankAccountNumber', 'Amount', 'AmountInCents', 'TransactionIdentifier', 'ReceiverName'
+)
+
+def batch_key(record):
+    """
+    Entries sharing this key go into the same batch:
+    (SEC code, effective entry date, company ID, credit or debit service class).
+    """
+    if type(record) is ACHTransaction:
+        standard_entry_class_code, effective_entry_date, company_id, transaction_type = TRANSACTION_BATCH_FIELDS(record)
+    else:
+        standard_entry_class_code, effective_entry_date, company_id, transaction_type = (
+            record['StandardEntryClassCode'], record.get('EffectiveEntryDate'), record['CompanyId'], record['TransactionType']
+        )
+    return (
+        standard_entry_class_code,
+        effective_entry_date or "",
+        company_id,
+        'Debit' if transaction_type == 'Debit' else 'Credit'
+    )
+
+def check_control_fields(batchTotals):
+    """
+    Check that the counts and totals of every batch, and of the file, fit the fields of their
+    control records, before the controls are written.
+
+    :param batchTotals: ACHTotals of every batch of the file, in batch order.
+    :raises ValueError: If a count or a total is too large for its field.
+    """
+    file_totals = ACHTotals()
+    for batch_number, totals in enumerate(batchTotals, start=1):
+        totals.checkFits(MAX_BATCH_ENTRY_COUNT, f"Batch {batch_number}")
+        file_totals.merge(totals)
+    file_totals.checkFits(MAX_FILE_ENTRY_COUNT, "The file")
+    if len(batchTotals) > MAX_BATCH_COUNT:
+        raise ValueError(f"The file has {len(batchTotals)} batches; its file control holds at most {MAX_BATCH_COUNT}.")
+    line_count = 2 + 2 * len(batchTotals) + file_totals.entryAddendaCount
+    if (line_count + 9) // 10 > MAX_BLOCK_COUNT:
+        raise ValueError(f"The file has {line_count} records; its file control holds at most {MAX_BLOCK_COUNT} blocks of 10.")
+
+def render_record(entry_number, record, originatingDFI, totals, render=ACH_EntryDetail.render):
+    """
+    Render one Entry Detail record and add it to the running totals.
+    :param render: Entry renderer with the arguments of ACH_EntryDetail.render, e.g. ReceiverSegmentCache.render.
+    """
+    # Rows validated on load already carry the amount in cents
+    if type(record) is ACHTransaction:
+        transaction_type, receiving_dfi, account_number, amount, amount_in_cents, transaction_identifier, receiver_name = TRANSACTION_ENTRY_FIELDS(record)
+        if amount_in_cents is None:
+            amount_in_cents = toCents(amount)
+    else:
+        transaction_type, receiving_dfi, account_number, amount_in_cents, transaction_identifier, receiver_name = (
+            record['TransactionType'], record['ReceivingDFI'], record['ReceivingBankAccountNumber'],
+            record.get('AmountInCents'), record['TransactionIdentifier'], record['ReceiverName']
+        )
+        # Short CSV rows read with csv.DictReader have None for their missing columns
+        if None in (transaction_type, receiving_dfi, account_number, transaction_identifier, receiver_name):
+            raise ValueError(f"Entry {entry_number} is missing fields; check that its row has every column of the header.")
+        if amount_in_cents is None:
+            amount_in_cents = toCents(record['Amount'])
+    if not 0 <= amount_in_cents <= MAX_AMOUNT_CENTS:
+        raise ValueError(AMOUNT_RANGE_MESSAGE)
+    if entry_number > MAX_ENTRY_NUMBER:
+        raise ValueError(ENTRY_NUMBER_RANGE_MESSAGE)
+    entry = check_ascii(entry_number, render(
+        transaction_type,
+        receiving_dfi,
+        account_number,
+        amount_in_cents,
+        transaction_identifier,
+        receiver_name,
+        originatingDFI,
+        entry_number
+    ))
+    totals.add(receiving_dfi, amount_in_cents, transaction_type == 'Debit')
+    return entry
+
+def render_chunk(numberedRecords, originatingDFI, receiverCache=None):
+    """
+    Render a chunk of entries from one batch. Runs in a worker process when the generator has workers.
+
+    :param numberedRecords: List of (entry number, record) pairs.
+    :param originatingDFI: Originating bank routing number used in the trace numbers.
+    :param receiverCache: Optional ReceiverSegmentCache of recurring receivers (in-process rendering only).
+    :return: (rendered entries as text, each followed by the line separator; partial ACHTotals of the chunk)
+    """
+    totals = ACHTotals()
+    render = ACH_EntryDetail.render if receiverCache is None else receiverCache.render
+    entries = [render_record(entry_number, record, originatingDFI, totals, render) for entry_number, record in numberedRecords]
+    entries.append("")
+    return LINE_SEPARATOR.join(entries), totals
+
+def render_chunk_timed(render, numberedRecords, originatingDFI):
+    """
+    Run a chunk renderer and measure it where it runs (in the worker process, when there are workers).
+    :return: (rendered entries, partial totals, seconds, net allocated blocks)
+    """
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    entries, totals = render(numberedRecords, originatingDFI)
+    return entries, totals, time.perf_counter() - start, sys.getallocatedblocks() - blocks
+
+def write_chunk(mapped, offset, numberedRecords, originatingDFI, receiverCache=None):
+    """
+    Render a chunk of entries from one batch straight into a memory-mapped output file,
+    each record at its own offset, without joining the chunk into one text.
+
+    :param mapped: Writable mmap of the output file.
+    :param offset: Byte offset of the first entry of the chunk.
+    :param receiverCache: Optional ReceiverSegmentCache of recurring receivers (in-process rendering only).
+    :return: Partial ACHTotals of the chunk.
+    """
+    totals = ACHTotals()
+    separator = LINE_SEPARATOR.encode('ascii')
+    render = ACH_EntryDetail.render if receiverCache is None else receiverCache.render
+    for entry_number, record in numberedRecords:
+        entry = render_record(entry_number, record, originatingDFI, totals, render)
+        if len(entry) != RECORD_LENGTH:
+            raise ValueError(f"Entry {entry_number} renders to {len(entry)} characters instead of {RECORD_LENGTH}.")
+        mapped[offset:offset + RECORD_LENGTH] = encode_mapped(entry_number, entry)
+        mapped[offset + RECORD_LENGTH:offset + RECORD_STRIDE] = separator
+        offset += RECORD_STRIDE
+    return totals
+
+def check_ascii(entryNumber, line):
+    """
+    Return a rendered record if it is plain ASCII. ACH records are fixed-width 94-byte lines,
+    and a non-ASCII character would take more than one byte in the file and shift every record after it.
+    :param entryNumber: Entry number of the record, or None for a header record.
+    :raises ValueError: If the record has non-ASCII characters (e.g. accented letters).
+    """
+    if not line.isascii():
+        location = f"Entry {entryNumber}" if entryNumber is not None else "A header record"
+        raise ValueError(f"{location} has non-ASCII characters; ACH records must be plain ASCII text.")
+    return line
+
+def encode_mapped(entryNumber, line):
+    """
+    Encode a record for the memory-mapped output, where every record takes exactly its 94 bytes.
+    :raises ValueError: If the record has non-ASCII characters, which would not fit its offset.
+    """
+    return check_ascii(entryNumber, line).encode('ascii')
+
+def write_chunk_to_file(write, filePath, offset, numberedRecords, originatingDFI):
+    """
+    Map the output file and run a chunk writer on it. Runs in a worker process: the worker's
+    mapping shares the file's pages with every other process, so only the totals are sent back.
+    :return: (partial totals, seconds, net allocated blocks)
+    """
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    with open(filePath, 'r+b') as file, mmap.mmap(file.fileno(), 0) as mapped:
+        totals = write(mapped, offset, numberedRecords, originatingDFI)
+    return totals, time.perf_counter() - start, sys.getallocatedblocks() - blocks
+
+
+class ACHBatch:
+    """
+    Entries grouped under one batch key while the records are read.
+    Rendered entries are spooled (to disk once large) until the batch is written out.
+    """
+
+    def __init__(self, key, firstRecord):
+        self.key            = key
+        self.firstRecord    = firstRecord   # Batch header fields come from the first entry of the batch
+        self.totals         = ACHTotals()
+        self.pending        = []            # (entry number, record) pairs not yet sent to a worker
+        self.spool          = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode='w+', newline='')
+
+    def write_chunk(self, entries, totals):
+        """Spool a chunk of rendered entries and reduce its partial totals into the batch totals."""
+        self.spool.write(entries)
+        self.totals.merge(totals)
+
+    def entries(self):
+        """Yield the spooled Entry Detail records in order, then release the spool."""
+        with self.spool as spool:
+            spool.seek(0)
+            for line in spool:
+                yield line[:-2]
+
+    def header(self, batchNumber, originatingDFI):
+        """Build the Batch Header record for this batch."""
+        standard_entry_class_code, effective_entry_date, company_id, transaction_type = self.key
+        return ACH_BatchHeader(
+            transactionType=transaction_type,
+            companyName=self.firstRecord['CompanyName'],
+            companyId=company_id,
+            standardEntryClassCode=standard_entry_class_code,
+            entryDescription=self.firstRecord['EntryDescription'],
+            effectiveTransactionDate=effective_entry_date,
+            originatingBankRoutningNumber=originatingDFI,
+            batchNumber=batchNumber
+        )
+
+    def control(self, batchNumber, originatingDFI, serviceClassCode):
+        """Build the Batch Control record from the batch totals."""
+        return ACH_BatchControlRecord(
+            entryAddendaCount=self.totals.entryAddendaCount,
+            entryHash=self.totals.formattedEntryHash(),
+            totalDebitAmount=str(self.totals.totalDebitAmount),
+            totalCreditAmount=str(self.totals.totalCreditAmount),
+            companyId=self.key[2],
+            originatingBankRoutingNumber=originatingDFI,
+            batchNumber=batchNumber,
+            serviceClassCode=serviceClassCode
+        )
+
 
 class ACHFileGenerator:
-    def __init__(self, records=[]):
-        self.records = records
-                
-    def calculate_entry_hash(self):
-        """Calculate the Entry Hash by summing the first 8 digits of all routing numbers"""
-        total_hash = 0
-        for record in self.records:
-            # Extract the first 8 digits of the routing number
-            first_8_digits = int(record['ReceivingDFI'][:8])
-            total_hash += first_8_digits
-        
-        # Format as a 10-digit string (padded with leading zeros if necessary)
-        return str(total_hash).zfill(10)
-
-    def calculate_total_debit_amount(self):
-        """Calculate the total debit amount from all records."""
-        total_debit = 0
-        for record in self.records:
-            # Assuming 'Amount' field can have decimals and is negative for debits
-            amount = float(record['Amount'])  # Convert the string amount to float
-            if amount < 0:  # Negative amounts are debits
-                total_debit += abs(amount)  # Add absolute value for debits
-        return str(int(total_debit * 100))  # Convert to cents (as integer)
-
-    def calculate_total_credit_amount(self):
-        """Calculate the total credit amount from all records."""
-        total_credit = 0
-        for record in self.records:
-            # Assuming 'Amount' field can have decimals and is positive for credits
-            amount = float(record['Amount'])  # Convert the string amount to float
-            if amount > 0:  # Positive amounts are credits
-                total_credit += amount  # Add value for credits
-        return str(int(total_credit * 100))  # Convert to cents (as integer)
-    
-    def generate(self):
-        """Generate the full ACH content"""
+    def __init__(self, records=[], workers=1, chunkSize=ENTRY_CHUNK_SIZE, columnar=False, routingDirectory=None, instrumentation=None,
+                 duplicateIndex=None, receiverCache=None):
+        """
+        :param records: Payload records, as a list or any iterable (e.g. a generator over CSV rows).
+                        An iterable is consumed once, row by row, while the file is generated.
+        :param workers: Number of worker processes rendering entries; 1 renders in this process.
+        :param chunkSize: Number of entries rendered per task.
+        :param columnar: Render each chunk with the vectorised NumPy backend (ACH_Columnar).
+        :param routingDirectory: Optional RoutingDirectory; unknown or inactive receiving DFIs raise ValueError.
+        :param instrumentation: Optional Instrumentation recording per-stage timings and counters;
+                                its callback receives the summary once generate_to has written the file.
+        :param duplicateIndex: Optional DuplicateIndex; an entry already sent in an earlier file within its
+                               window raises ValueError, and the entries are recorded once the file is written.
+        :param receiverCache: Optional ReceiverSegmentCache; entries of recurring receivers are rendered from their
+                              cached segments. Used when entries are rendered in this process (one worker, not columnar).
+        """
+        self.records            = records
+        self.workers            = workers
+        self.chunkSize          = chunkSize
+        self.columnar           = columnar
+        self.routingDirectory   = routingDirectory
+        self.instrumentation    = instrumentation
+        self.duplicateIndex     = duplicateIndex
+        self.receiverCache      = receiverCache
+        self.duplicateCheck     = None  # Entries of the file being generated, when there is a duplicate index
+        self.totals             = None  # File totals (ACHTotals), set once all batches are written
+        self.batchCount         = 0
+
+    def iter_lines(self):
+        """
+        Yield the ACH file one record at a time, without line separators.
+        Entries are grouped into batches by SEC code, effective date, company ID and
+        credit/debit service class; controls and block padding come from running totals.
+        """
+        # Header fields come from the first record; the rest are consumed lazily
+        records = iter(self.records)
+        first_record = next(records, None)
+        if first_record is None:
+            raise ValueError("No records found to generate the ACH file.")
+
         # Initialize ACH File Header
         file_header = ACH_FileHeader(
-            immediateOrigin=self.records[0]['ImmediateOrigin'],
-            immediateDestination=self.records[0]['ImmediateDestination'],
-            immediateOriginRoutingNumber=self.records[0]['ImmediateOriginRoutingNumber'],
-            immediateDestinationRoutingNumber=self.records[0]['ImmediateDestinationRoutingNumber'] ,
-            reference=self.records[0]['Reference']
+            immediateOrigin=first_record['ImmediateOrigin'],
+            immediateDestination=first_record['ImmediateDestination'],
+            immediateOriginRoutingNumber=first_record['ImmediateOriginRoutingNumber'],
+            immediateDestinationRoutingNumber=first_record['ImmediateDestinationRoutingNumber'] ,
+            reference=first_record['Reference']
             )
+        yield check_ascii(None, self.measure("File Header", file_header.generate))
 
-        # Initialize ACH Batch Header
-        batch_header = ACH_BatchHeader(
-            transactionType=self.records[0]['TransactionType'],
-            companyName=self.records[0]['CompanyName'],
-            companyId=self.records[0]['CompanyId'],
-            standardEntryClassCode=self.records[0]['StandardEntryClassCode'],
-            entryDescription=self.records[0]['EntryDescription'],
-            effectiveTransactionDate="",
-            originatingBankRoutningNumber=self.records[0]['ImmediateDestinationRoutingNumber'],
-            batchNumber="1"
+        originating_dfi = first_record['ImmediateDestinationRoutingNumber']
+        batches = self.render_batches(chain((first_record,), records), originating_dfi)
 
-        )
+        file_totals = ACHTotals()
+        batch_count = 0
+        for batch in batches:
+            batch_count += 1
+            batch_header = batch.header(batch_count, originating_dfi)
+            yield check_ascii(None, self.measure("Batch Header", batch_header.generate))
+            if self.instrumentation is None:
+                yield from batch.entries()
+            else:
+                yield from self.instrumentation.iterate("Entry Detail spool read", batch.entries())
+            batch_control = batch.control(batch_count, originating_dfi, batch_header.getServiceClassCode(batch_header.transactionType))
+            yield self.measure("Batch Control", batch_control.generate)
+            file_totals.merge(batch.totals)
 
-        # Loop through records and generate Entry Detail for each row
-        entry_details = []
-        entry_number = 1  # Start from 1 or any desired starting number
-        for record in self.records:
-            entry_detail = ACH_EntryDetail(
-                transactionType=record['TransactionType'],
-                receivingBankRoutingNumber=record['ReceivingDFI'],
-                receivingBankAccountNumber=record['ReceivingBankAccountNumber'],
-                amount=record['Amount'],
-                transactionIdentifier=record['TransactionIdentifier'],
-                receiverName=record['ReceiverName'],
-                originatingBankRoutningNumber=self.records[0]['ImmediateDestinationRoutingNumber'],
-                entryNumber=entry_number
-            )
-            entry_details.append(entry_detail.generate())
-            entry_number += 1
-        # Calculate Entry Hash, Total Debit, and Total Credit Amount
-        entry_hash = self.calculate_entry_hash()
-        total_debit_amount = self.calculate_total_debit_amount()  # Correctly calculate debit
-        total_credit_amount = self.calculate_total_credit_amount()  # Correctly calculate credit
-
-        # Initialize ACH Batch Header
-        batch_control = ACH_BatchControlRecord(
-            entryAddendaCount=len(entry_details),
-            entryHash=entry_hash,
-            totalDebitAmount=str(total_debit_amount),
-            totalCreditAmount=str(total_credit_amount),
-            companyId=self.records[0]['CompanyId'],
-            originatingBankRoutingNumber=self.records[0]['ImmediateDestinationRoutingNumber'],
-            batchNumber="1"
+        self.totals = file_totals
+        self.batchCount = batch_count
+
+        # File header, batch header/control pairs, entries and the file control
+        line_count = 2 + 2 * batch_count + file_totals.entryAddendaCount
 
-        )
         # Initialize ACH File Control Record
         file_control = ACH_FileControlRecord(
-            batchCount=1,  # Just an example; you may need to adjust this based on your needs
-            blockCount=1,  # Assuming a single block; adjust as needed
-            entryAddendaCount=len(entry_details),  # For simplicity, assuming entry count equals addenda count
-            entryHash=entry_hash,  # Placeholder; calculate if needed
-            totalDebitAmount=str(total_debit_amount),  # Placeholder; calculate total debit amount
-            totalCreditAmount=str(total_credit_amount)  # Placeholder; calculate total credit amount
+            batchCount=batch_count,
+            blockCount=(line_count + 9) // 10,
+            entryAddendaCount=file_totals.entryAddendaCount,
+            entryHash=file_totals.formattedEntryHash(),
+            totalDebitAmount=str(file_totals.totalDebitAmount),
+            totalCreditAmount=str(file_totals.totalCreditAmount)
         )
+        yield self.measure("File Control", file_control.generate)
 
-        # Generate ACH file content
-        ach_file = file_header.generate() + '\r\n' + batch_header.generate() + '\r\n'
-        for entry in entry_details:
-            ach_file += entry  + '\r\n'
-        ach_file += batch_control.generate()  + '\r\n'
-        ach_file += file_control.generate()
+        # Pad with '9' lines so the total line count is a multiple of 10
+        padding_lines = self.padding_line_count(line_count)
+        yield from self.measure("Padding", lambda: [PADDING_LINE] * padding_lines, rows=padding_lines)
+
+    def measure(self, stage, render, rows=1):
+        """Call render, recording it as rows (one record by default) of the given stage when the generator is instrumented."""
+        if self.instrumentation is None:
+            return render()
+        with self.instrumentation.stage(stage, rows=rows):
+            return render()
+
+    def render_batches(self, records, originatingDFI):
+        """
+        Render entries in chunks while the records are read, in this process or on a process pool.
+        Entry numbers are assigned in record order before a chunk is rendered, and chunk results
+        are collected in submission order, so the output does not depend on the number of workers.
+        At most two chunks per worker are in flight, which keeps memory bounded.
+        Returns the batches in order of each batch's first record, once their counts and totals
+        are known to fit the control records.
+        """
+        if self.columnar:
+            from ACH_Service.ACH_Columnar import render_chunk_columnar as render
+        else:
+            render = render_chunk
+            if self.receiverCache is not None and self.workers <= 1:
+                render = partial(render_chunk, receiverCache=self.receiverCache)
+        instrumentation = self.instrumentation
+        batches = {}
+        in_flight = deque()  # (batch, chunk size, future) in submission order
+        max_in_flight = 2 * self.workers
+        executor = None
+        if self.workers > 1:
+            # Imported on demand: the process pool machinery is a large share of CLI start-up time
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        def submit(batch):
+            if instrumentation is None:
+                task, args = render, (batch.pending, originatingDFI)
+            else:
+                task, args = render_chunk_timed, (render, batch.pending, originatingDFI)
+            if executor is None:
+                store(batch, len(batch.pending), task(*args))
+            else:
+                in_flight.append((batch, len(batch.pending), executor.submit(task, *args)))
+                while len(in_flight) > max_in_flight:
+                    collect()
+            batch.pending = []
+
+        def collect():
+            batch, rows, future = in_flight.popleft()
+            store(batch, rows, future.result())
+
+        def store(batch, rows, result):
+            if instrumentation is None:
+                entries, totals = result
+            else:
+                entries, totals, seconds, allocated_blocks = result
+                instrumentation.add("Entry Detail", seconds, rows, len(entries), allocated_blocks)
+            batch.write_chunk(entries, totals)
+
+        duplicate_check = self.start_duplicate_check()
+        try:
+            for entry_number, record in enumerate(records, start=1):
+                if self.routingDirectory is not None:
+                    reason = self.routingDirectory.check(record['ReceivingDFI'])
+                    if reason:
+                        raise ValueError(f"Entry {entry_number}: {reason}")
+                if duplicate_check is not None:
+                    duplicate_check.add(entry_number, record)
+                key = batch_key(record)
+                batch = batches.get(key)
+                if batch is None:
+                    batch = batches[key] = ACHBatch(key, record)
+                batch.pending.append((entry_number, record))
+                if len(batch.pending) >= self.chunkSize:
+                    submit(batch)
+
+            if duplicate_check is not None:
+                duplicate_check.flush()
+            for batch in batches.values():
+                if batch.pending:
+                    submit(batch)
+            while in_flight:
+                collect()
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        check_control_fields([batch.totals for batch in batches.values()])
+        return list(batches.values())
+
+    def generate_to(self, stream):
+        """
+        Write the ACH file to a text stream as it is rendered.
+
+        Args:
+            stream: Any object with a ``writelines`` method, e.g. a file opened with newline=''.
+        """
+        lines = (line + LINE_SEPARATOR for line in self.iter_lines())
+        if self.instrumentation is None:
+            stream.writelines(lines)
+            self.record_entries(getattr(stream, 'name', 'ACH file'))
+            return
+
+        # Write in blocks so the write stage is measured apart from rendering
+        while True:
+            block = list(islice(lines, WRITE_BLOCK_LINES))
+            if not block:
+                break
+            with self.instrumentation.stage("Write", rows=len(block), bytes=sum(map(len, block))):
+                stream.writelines(block)
+        self.record_entries(getattr(stream, 'name', 'ACH file'))
+        self.instrumentation.finish()
+
+    def write_mapped(self, filePath):
+        """
+        Write the ACH file to a path by preallocating it at its final size and memory-mapping it.
+
+        Records are grouped into batches first, which fixes the line count and therefore the
+        offset of every record. Entry chunks are then rendered straight to their offsets (by
+        worker processes mapping the same file, when the generator has workers), so rendered
+        entries are never joined, spooled or sent back between processes. Records are held
+        until the layout is known, so memory grows with the number of records, unlike generate_to.
+
+        Args:
+            filePath (str): Path of the ACH file to write; an existing file is replaced.
+        """
+        if self.columnar:
+            from ACH_Service.ACH_Columnar import write_chunk_columnar as write
+        else:
+            write = write_chunk
+            if self.receiverCache is not None and self.workers <= 1:
+                write = partial(write_chunk, receiverCache=self.receiverCache)
+        instrumentation = self.instrumentation
+
+        records = iter(self.records)
+        first_record = next(records, None)
+        if first_record is None:
+            raise ValueError("No records found to generate the ACH file.")
+        originating_dfi = first_record['ImmediateDestinationRoutingNumber']
+
+        batches = {}
+        duplicate_check = self.start_duplicate_check()
+        for entry_number, record in enumerate(chain((first_record,), records), start=1):
+            if self.routingDirectory is not None:
+                reason = self.routingDirectory.check(record['ReceivingDFI'])
+                if reason:
+                    raise ValueError(f"Entry {entry_number}: {reason}")
+            if duplicate_check is not None:
+                duplicate_check.add(entry_number, record)
+            key = batch_key(record)
+            batch = batches.get(key)
+            if batch is None:
+                batch = batches[key] = ACHBatch(key, record)
+            batch.pending.append((entry_number, record))
+        if duplicate_check is not None:
+            duplicate_check.flush()
+        batches = list(batches.values())
+
+        # File header, batch header/control pairs, entries and the file control
+        line_count = 2 + 2 * len(batches) + sum(len(batch.pending) for batch in batches)
+        file_size = (line_count + self.padding_line_count(line_count)) * RECORD_STRIDE
+
+        with open(filePath, 'w+b') as file:
+            file.truncate(file_size)
+            if hasattr(os, 'posix_fallocate'):
+                # Reserve the blocks now, so a full disk fails here rather than on a page fault later
+                os.posix_fallocate(file.fileno(), 0, file_size)
+            with mmap.mmap(file.fileno(), file_size) as mapped:
+
+                def put(lineNumber, line):
+                    mapped[lineNumber * RECORD_STRIDE:(lineNumber + 1) * RECORD_STRIDE] = encode_mapped(None, line + LINE_SEPARATOR)
+
+                file_header = ACH_FileHeader(
+                    immediateOrigin=first_record['ImmediateOrigin'],
+                    immediateDestination=first_record['ImmediateDestination'],
+                    immediateOriginRoutingNumber=first_record['ImmediateOriginRoutingNumber'],
+                    immediateDestinationRoutingNumber=first_record['ImmediateDestinationRoutingNumber'],
+                    reference=first_record['Reference']
+                )
+                put(0, self.measure("File Header", file_header.generate))
+
+                # Offsets of every batch's entries, then render the entry chunks into them
+                tasks = []  # (batch, number of entries, writer arguments)
+                line_number = 1
+                for batch in batches:
+                    for start in range(0, len(batch.pending), self.chunkSize):
+                        chunk = batch.pending[start:start + self.chunkSize]
+                        tasks.append((batch, len(chunk), ((line_number + 1 + start) * RECORD_STRIDE, chunk, originating_dfi)))
+                    line_number += 2 + len(batch.pending)
+
+                if self.workers > 1:
+                    from concurrent.futures import ProcessPoolExecutor
+                    with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                        futures = [(batch, rows, executor.submit(write_chunk_to_file, write, filePath, *args)) for batch, rows, args in tasks]
+                        results = [(batch, rows, future.result()) for batch, rows, future in futures]
+                else:
+                    results = []
+                    for batch, rows, args in tasks:
+                        blocks = sys.getallocatedblocks()
+                        started = time.perf_counter()
+                        totals = write(mapped, *args)
+                        results.append((batch, rows, (totals, time.perf_counter() - started, sys.getallocatedblocks() - blocks)))
+                for batch, rows, (totals, seconds, allocated_blocks) in results:
+                    batch.totals.merge(totals)
+                    if instrumentation is not None:
+                        instrumentation.add("Entry Detail", seconds, rows, rows * RECORD_STRIDE, allocated_blocks)
+
+                # Batch headers and controls around the entries, now that the batch totals are known
+                check_control_fields([batch.totals for batch in batches])
+                file_totals = ACHTotals()
+                line_number = 1
+                for batch_number, batch in enumerate(batches, start=1):
+                    batch_header = batch.header(batch_number, originating_dfi)
+                    put(line_number, self.measure("Batch Header", batch_header.generate))
+                    line_number += 1 + len(batch.pending)
+                    batch_control = batch.control(batch_number, originating_dfi, batch_header.getServiceClassCode(batch_header.transactionType))
+                    put(line_number, self.measure("Batch Control", batch_control.generate))
+                    line_number += 1
+                    file_totals.merge(batch.totals)
+                    batch.pending = []
+                    batch.spool.close()
+
+                self.totals = file_totals
+                self.batchCount = len(batches)
+
+                file_control = ACH_FileControlRecord(
+                    batchCount=len(batches),
+                    blockCount=(line_count + 9) // 10,
+                    entryAddendaCount=file_totals.entryAddendaCount,
+                    entryHash=file_totals.formattedEntryHash(),
+                    totalDebitAmount=str(file_totals.totalDebitAmount),
+                    totalCreditAmount=str(file_totals.totalCreditAmount)
+                )
+                put(line_number, self.measure("File Control", file_control.generate))
+
+                # Pad with '9' lines so the total line count is a multiple of 10
+                for padding_line_number in range(line_count, file_size // RECORD_STRIDE):
+                    put(padding_line_number, PADDING_LINE)
+                mapped.flush()
+
+        self.record_entries(filePath)
+        if instrumentation is not None:
+            instrumentation.finish()
+
+    def start_duplicate_check(self):
+        """Start collecting the entries of this file for the duplicate index, if there is one."""
+        self.duplicateCheck = self.duplicateIndex.checker() if self.duplicateIndex is not None else None
+        return self.duplicateCheck
+
+    def record_entries(self, fileName):
+        """Record the entries of the written file in the duplicate index, if there is one."""
+        if self.duplicateCheck is not None:
+            self.duplicateCheck.record(fileName)
+            self.duplicateCheck = None
+
+    def generate(self):
+        """Generate the full ACH content"""
+        buffer = io.StringIO()
+        self.generate_to(buffer)
+        return buffer.getvalue()
 
-        # Pad lines to ensure the total line count is a multiple of 10
-        ach_file = self.pad_lines_to_multiple_of_10(ach_file) + '\r\n'
-        return ach_file
+    def padding_line_count(self, line_count):
+        """Number of '9' padding lines needed to bring line_count up to a multiple of 10."""
+        return (10 - (line_count % 10)) % 10
 
     def pad_lines_to_multiple_of_10(self, ach_file_content):
         """
@@ -139,7 +608,6 @@ class ACHFileGenerator:
         
         # Append lines with all '9's if necessary
         if lines_to_add > 0:
-            padding_line = '9' * 94  # Assuming a fixed-width line of 94 characters
-            lines.extend([padding_line] * lines_to_add)
+            lines.extend([PADDING_LINE] * lines_to_add)
         
         return '\r\n'.join(lines)  # Rejoin lines with '\r\n'
\ No newline at end of file
@@ -0,0 +1,329 @@
+import asyncio, csv, io, json, logging, os, sys, tempfile, time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the parent directory of the current file to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ACH_Service.ACH_CSVHandler import validate_transaction
+from ACH_Service.ACH_Generator import ACHFileGenerator
+from ACH_Service.ACH_PayloadCreator import iterPayload
+from ACH_Util.Logger import getLogger, logEvent
+
+logger = getLogger("http")
+
+MAX_BODY_SIZE = 64 * 1024 * 1024
+MAX_LINE_SIZE = 64 * 1024    # Longest request or header line read from a client
+MAX_HEADER_COUNT = 100
+RESPONSE_CHUNK_SIZE = 64 * 1024
+MAX_REPORTED_ISSUES = 100
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    411: "Length Required", 413: "Payload Too Large", 415: "Unsupported Media Type",
+    431: "Request Header Fields Too Large", 500: "Internal Server Error",
+}
+
+class HTTPError(Exception):
+    def __init__(self, status, message, issues=None):
+        super().__init__(message)
+        self.status = status
+        self.issues = issues    # Validation messages reported with the error, if any
+
+class InvalidTransactions(ValueError):
+    """Validation issues of a request body, raised in the worker process and answered with 400."""
+
+    def __init__(self, issues):
+        super().__init__(issues)  # Only the issues, so the exception pickles back from the worker
+        self.issues = issues
+
+    def __str__(self):
+        return f"{len(self.issues)} validation issue(s) in the transactions"
+
+def render_request(contentType, body, companyDetail):
+    """
+    Build the ACH file for one request body. Runs in a worker process, so parsing and rendering never block the event loop.
+
+    A JSON body is either a list of transactions or {"company": {...}, "transactions": [...]};
+    a CSV body has a header row and one transaction per line. Transactions use the same fields as
+    preparePayload (e.g. "Receiver Name", "Receiver Routing Number", "Amount") and are mapped with
+    the request's company details, or the service's company profile when none are given.
+    Every transaction is validated like a CSV upload (validate_transaction) before anything is rendered.
+
+    The file is written to a temporary file as it is rendered, so neither this process nor the
+    event loop holds the whole file; the caller streams it to the client and removes it.
+
+    :return: (path of the rendered ACH file, number of entries)
+    :raises InvalidTransactions: With the issues of every invalid transaction.
+    """
+    if contentType == "application/json":
+        request = json.loads(body)
+        if isinstance(request, dict) and "transactions" in request:
+            companyDetail = {**companyDetail, **request.get("company", {})}
+            request = request["transactions"]
+        if isinstance(request, dict):
+            request = [request]
+        if not isinstance(request, list):
+            raise ValueError("The JSON body must be a transaction, a list of transactions or an object with 'transactions'.")
+        transactions = request
+        first_row_number = 1
+    else:
+        transactions = csv.DictReader(io.StringIO(body.decode("utf-8-sig"), newline=''))
+        first_row_number = 2  # The header is row 1
+
+    issues = []
+    validated = []
+    for row_num, transaction in enumerate(transactions, start=first_row_number):
+        if not isinstance(transaction, dict):
+            issues.append(f"Row {row_num}: Each transaction must be an object.")
+            continue
+        amount_in_cents = validate_transaction(row_num, transaction, None, issues)
+        if amount_in_cents is not None:
+            validated.append({**transaction, "Amount In Cents": amount_in_cents})
+    if issues:
+        raise InvalidTransactions(issues)
+
+    ach_generator = ACHFileGenerator(iterPayload(companyDetail, validated))
+    descriptor, ach_file_path = tempfile.mkstemp(prefix="ach_response_", suffix=".txt")
+    try:
+        with open(descriptor, 'w', newline='', encoding='ascii') as ach_file:
+            ach_generator.generate_to(ach_file)
+    except BaseException:
+        os.remove(ach_file_path)
+        raise
+    return ach_file_path, ach_generator.totals.entryAddendaCount
+
+
+class ServiceMetrics:
+    """Request and throughput counters reported by /metrics."""
+
+    def __init__(self):
+        self.started        = time.monotonic()
+        self.requests       = 0
+        self.failed         = 0
+        self.inFlight       = 0
+        self.files          = 0
+        self.entries        = 0
+        self.bytesSent      = 0
+        self.renderSeconds  = 0.0
+
+    def to_dict(self):
+        uptime = time.monotonic() - self.started
+        return {
+            "uptime_seconds"            : round(uptime, 3),
+            "requests"                  : self.requests,
+            "failed"                    : self.failed,
+            "in_flight"                 : self.inFlight,
+            "files_generated"           : self.files,
+            "entries_generated"         : self.entries,
+            "bytes_sent"                : self.bytesSent,
+            "requests_per_second"       : round(self.requests / uptime, 3) if uptime else 0.0,
+            "entries_per_second"        : round(self.entries / uptime, 3) if uptime else 0.0,
+            "average_render_seconds"    : round(self.renderSeconds / self.files, 6) if self.files else 0.0,
+        }
+
+
+class ACHHTTPService:
+    """
+    Local HTTP/1.1 service for ACH generation, built on asyncio streams.
+
+    POST /generate  Body in JSON or CSV (see render_request); responds with the ACH file.
+    GET  /health    Liveness check.
+    GET  /metrics   Request and throughput counters as JSON.
+
+    Parsing, validation and rendering run on a process pool. The worker streams the rendered
+    file into a temporary file, which is then read and written to the socket in chunks, waiting
+    on the socket between them: memory per request does not grow with the file, and a slow
+    client does not hold the event loop. Invalid transactions are answered with 400 and the
+    list of issues. Connections are kept alive between requests.
+    """
+
+    def __init__(self, companyDetail=None, workers=None, host="127.0.0.1", port=8080):
+        """
+        :param companyDetail: Company profile used when a request does not carry its own.
+        :param workers: Number of rendering processes; defaults to the number of CPUs.
+        """
+        self.companyDetail  = companyDetail or {}
+        self.workers        = workers or os.cpu_count() or 1
+        self.host           = host
+        self.port           = port
+        self.metrics        = ServiceMetrics()
+        self.executor       = None
+        self.server         = None
+
+    async def start(self):
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port, limit=MAX_LINE_SIZE)
+        self.port = self.server.sockets[0].getsockname()[1]  # The bound port when 0 was requested
+        logEvent(logger, logging.INFO, "service_started", host=self.host, port=self.port, workers=self.workers)
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self.read_request(reader, writer)
+                if request is None:
+                    break
+                method, path, headers, body, keep_alive = request
+                await self.handle_request(method, path, headers, body, writer, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader, writer):
+        """
+        Read one request. Returns None when the client closed the connection or the request was rejected.
+        :return: (method, path, headers, body, keep alive)
+        """
+        try:
+            request_line = await reader.readline()
+        except ValueError:  # No line end within MAX_LINE_SIZE
+            await self.send_error(writer, 400, f"The request line must not exceed {MAX_LINE_SIZE} bytes.", False)
+            return None
+        if not request_line.strip():
+            return None
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            await self.send_error(writer, 400, "Malformed request line.", False)
+            return None
+
+        headers = {}
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                await self.send_error(writer, 431, f"Header lines must not exceed {MAX_LINE_SIZE} bytes.", False)
+                return None
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADER_COUNT:
+                await self.send_error(writer, 400, "Too many headers.", False)
+                return None
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+        body = b""
+        if "transfer-encoding" in headers:
+            await self.send_error(writer, 411, "Send the body with a Content-Length.", False)
+            return None
+        length = headers.get("content-length")
+        if length:
+            if not length.isdigit():
+                await self.send_error(writer, 400, "Invalid Content-Length.", False)
+                return None
+            if int(length) > MAX_BODY_SIZE:
+                await self.send_error(writer, 413, f"The body must not exceed {MAX_BODY_SIZE} bytes.", False)
+                return None
+            body = await reader.readexactly(int(length))
+        return method, target.split("?", 1)[0], headers, body, keep_alive
+
+    async def handle_request(self, method, path, headers, body, writer, keepAlive):
+        self.metrics.requests += 1
+        try:
+            if path == "/health":
+                await self.send(writer, 200, "application/json", b'{"status": "ok"}', keepAlive)
+            elif path == "/metrics":
+                await self.send(writer, 200, "application/json", json.dumps(self.metrics.to_dict()).encode(), keepAlive)
+            elif path == "/generate":
+                if method != "POST":
+                    raise HTTPError(405, "Use POST to generate an ACH file.")
+                content_type = headers.get("content-type", "application/json").split(";")[0].strip().lower()
+                if content_type not in ("application/json", "text/csv"):
+                    raise HTTPError(415, "Send the transactions as application/json or text/csv.")
+                await self.generate(content_type, body, writer, keepAlive)
+            else:
+                raise HTTPError(404, f"No such endpoint: {path}")
+        except HTTPError as e:
+            self.metrics.failed += 1
+            await self.send_error(writer, e.status, str(e), keepAlive, e.issues)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            raise
+        except Exception as e:
+            self.metrics.failed += 1
+            logEvent(logger, logging.ERROR, "request_error", path=path, error=f"{type(e).__name__}: {e}")
+            await self.send_error(writer, 500, "Internal error while generating the ACH file.", keepAlive)
+
+    async def generate(self, contentType, body, writer, keepAlive):
+        self.metrics.inFlight += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            ach_file_path, entries = await loop.run_in_executor(self.executor, render_request, contentType, body, self.companyDetail)
+        except InvalidTransactions as e:
+            raise HTTPError(400, f"Unable to generate ACH file: {e}", e.issues)
+        except (ValueError, KeyError, TypeError, UnicodeDecodeError, csv.Error) as e:
+            raise HTTPError(400, f"Unable to generate ACH file: {e}")
+        finally:
+            self.metrics.inFlight -= 1
+        self.metrics.renderSeconds += time.perf_counter() - start
+        self.metrics.files += 1
+        self.metrics.entries += entries
+        await self.send_file(writer, 200, "text/plain", ach_file_path, keepAlive)
+
+    def write_head(self, writer, status, contentType, length, keepAlive):
+        """Write the status line and headers of a response with a body of the given length."""
+        writer.write((
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: {contentType}\r\n"
+            f"Content-Length: {length}\r\n"
+            f"Connection: {'keep-alive' if keepAlive else 'close'}\r\n\r\n"
+        ).encode("latin-1"))
+
+    async def send_file(self, writer, status, contentType, filePath, keepAlive):
+        """Stream a rendered file as the response body in chunks, draining the socket after each, then remove the file."""
+        try:
+            with open(filePath, 'rb') as file:
+                length = os.fstat(file.fileno()).st_size
+                self.write_head(writer, status, contentType, length, keepAlive)
+                while True:
+                    chunk = file.read(RESPONSE_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    writer.write(chunk)
+                    await writer.drain()
+            await writer.drain()
+            self.metrics.bytesSent += length
+        finally:
+            os.remove(filePath)
+
+    async def send(self, writer, status, contentType, body, keepAlive):
+        """Write a response, draining the socket after every chunk of the body."""
+        self.write_head(writer, status, contentType, len(body), keepAlive)
+        for offset in range(0, len(body), RESPONSE_CHUNK_SIZE):
+            writer.write(body[offset:offset + RESPONSE_CHUNK_SIZE])
+            await writer.drain()
+        await writer.drain()
+        self.metrics.bytesSent += len(body)
+
+    async def send_error(self, writer, status, message, keepAlive, issues=None):
+        logEvent(logger, logging.WARNING, "request_failed", status=status, error=message)
+        error = {"error": message}
+        if issues:
+            error["issues"] = issues[:MAX_REPORTED_ISSUES]
+            error["issue_count"] = len(issues)
+        await self.send(writer, status, "application/json", json.dumps(error).encode(), keepAlive)
+
+def serve(companyDetail=None, workers=None, host="127.0.0.1", port=8080):
+    """Run the service until interrupted."""
+    service = ACHHTTPService(companyDetail, workers, host, port)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
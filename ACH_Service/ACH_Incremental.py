@@ -0,0 +1,299 @@
+import csv, os, sys, sqlite3, logging
+from hashlib import blake2b
+from itertools import chain
+
+# Add the parent directory of the current file to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ACH_FileFormat.ACH_1FileHeader import ACH_FileHeader
+from ACH_FileFormat.ACH_6FileControlRecord import ACH_FileControlRecord
+from ACH_Service.ACH_Generator import ACHBatch, ENTRY_NUMBER_RANGE_MESSAGE, LINE_SEPARATOR, MAX_ENTRY_NUMBER, PADDING_LINE, batch_key, check_ascii, check_control_fields, render_record
+from ACH_Service.ACH_Totals import ACHTotals
+from ACH_Util.Logger import getLogger, logEvent
+
+logger = getLogger("incremental")
+
+CACHE_SUFFIX = ".achcache"
+ENTRY_PREFIX_LENGTH = 87    # Entry Detail text before the Entry Number, the only part that depends on the row position
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    name                    TEXT PRIMARY KEY,
+    value                   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS batches (
+    id                      INTEGER PRIMARY KEY,
+    standard_entry_class    TEXT NOT NULL,
+    effective_entry_date    TEXT NOT NULL,
+    company_id              TEXT NOT NULL,
+    direction               TEXT NOT NULL,
+    entry_count             INTEGER NOT NULL,   -- Partial sums of the batch's rows in the last run
+    entry_hash              INTEGER NOT NULL,
+    total_debit             INTEGER NOT NULL,
+    total_credit            INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rows (
+    hash                    INTEGER PRIMARY KEY,    -- Content hash of the CSV row
+    batch_id                INTEGER NOT NULL,
+    prefix                  TEXT NOT NULL,          -- Rendered entry without its Entry Number
+    entry_hash              INTEGER NOT NULL,       -- The row's contribution to the entry hash
+    amount_cents            INTEGER NOT NULL,
+    debit                   INTEGER NOT NULL,
+    occurrences             INTEGER NOT NULL        -- Number of identical rows in the last run
+);
+"""
+
+def row_hash(row):
+    """64-bit content hash of a parsed CSV row."""
+    return int.from_bytes(blake2b("\x1f".join(row).encode(), digest_size=8).digest(), 'little', signed=True)
+
+def row_record(header, row):
+    """The payload record of a CSV row, as csv.DictReader reads it."""
+    record = dict(zip(header, row))
+    if len(row) < len(header):
+        record.update((column, None) for column in header[len(row):])
+    return record
+
+
+class RowCache:
+    """
+    SQLite cache of the rows of the last run over a CSV: the rendered entry of every distinct
+    row and its contributions to the control totals, plus the partial sums of every batch.
+    Saving a run only writes the rows and batches that changed.
+    """
+
+    def __init__(self, path):
+        self.path       = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def load(self, signature):
+        """
+        Load the cached rows and batches, or start empty when the cache was built for another
+        CSV header or originating DFI (the signature), which would change every rendered entry.
+        :return: (rows: hash -> (batch id, prefix, entry hash, cents, debit, occurrences),
+                  batches: batch key -> (batch id, ACHTotals), hashes of rows that occurred more than once)
+        """
+        saved = self.connection.execute("SELECT value FROM meta WHERE name = 'signature'").fetchone()
+        if saved is None or saved[0] != signature:
+            with self.connection:
+                self.connection.execute("DELETE FROM rows")
+                self.connection.execute("DELETE FROM batches")
+                self.connection.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('signature', ?)", (signature,))
+            return {}, {}, set()
+
+        rows = {row[0]: row[1:] for row in self.connection.execute(
+            "SELECT hash, batch_id, prefix, entry_hash, amount_cents, debit, occurrences FROM rows")}
+        batches = {}
+        for batch_id, *key, entry_count, entry_hash, total_debit, total_credit in self.connection.execute(
+                "SELECT id, standard_entry_class, effective_entry_date, company_id, direction, "
+                "entry_count, entry_hash, total_debit, total_credit FROM batches"):
+            totals = ACHTotals()
+            totals.entryAddendaCount, totals.entryHash, totals.totalDebitAmount, totals.totalCreditAmount = entry_count, entry_hash, total_debit, total_credit
+            batches[tuple(key)] = (batch_id, totals)
+        repeated = {row_hash for row_hash, in self.connection.execute("SELECT hash FROM rows WHERE occurrences > 1")}
+        return rows, batches, repeated
+
+    def save(self, inserted, occurrences, removed, batches):
+        """
+        Apply the changes of a run.
+        :param inserted: Rows seen for the first time: hash -> (batch id, prefix, entry hash, cents, debit).
+        :param occurrences: Hash -> new number of occurrences, for cached rows whose count changed.
+        :param removed: Hashes of cached rows no longer in the CSV.
+        :param batches: Batch key -> (batch id, ACHTotals) for every batch.
+        """
+        with self.connection:
+            self.connection.executemany("DELETE FROM rows WHERE hash = ?", ((row_hash,) for row_hash in removed))
+            self.connection.executemany(
+                "INSERT INTO rows (hash, batch_id, prefix, entry_hash, amount_cents, debit, occurrences) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((row_hash, *cached, occurrences.pop(row_hash)) for row_hash, cached in inserted.items())
+            )
+            self.connection.executemany("UPDATE rows SET occurrences = ? WHERE hash = ?",
+                                        ((count, row_hash) for row_hash, count in occurrences.items()))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO batches (id, standard_entry_class, effective_entry_date, company_id, direction, "
+                "entry_count, entry_hash, total_debit, total_credit) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((batch_id, *key, totals.entryAddendaCount, totals.entryHash, totals.totalDebitAmount, totals.totalCreditAmount)
+                 for key, (batch_id, totals) in batches.items())
+            )
+
+
+def write_file(ach_file_path, first_record, originating_dfi, entries, first_records, batches):
+    """
+    Write the ACH file from the rows of each batch and the batch totals.
+    :param entries: Batch key -> [(entry number, cached row)], batches in order of their first row.
+    :param first_records: Batch key -> record of the batch's first row, for the batch header.
+    :param batches: Batch key -> (batch id, ACHTotals).
+    :return: Entry count, batch count, debit/credit totals in cents and entry hash of the file.
+    """
+    file_header = ACH_FileHeader(
+        immediateOrigin=first_record['ImmediateOrigin'],
+        immediateDestination=first_record['ImmediateDestination'],
+        immediateOriginRoutingNumber=first_record['ImmediateOriginRoutingNumber'],
+        immediateDestinationRoutingNumber=first_record['ImmediateDestinationRoutingNumber'],
+        reference=first_record['Reference']
+    )
+    # Reused rows are written with their entry number here, without going through render_record
+    if sum(len(batch_entries) for batch_entries in entries.values()) > MAX_ENTRY_NUMBER:
+        raise ValueError(ENTRY_NUMBER_RANGE_MESSAGE)
+    check_control_fields([batches[key][1] for key in entries])
+    file_totals = ACHTotals()
+    with open(ach_file_path, 'w', newline='') as ach_file:
+        ach_file.write(check_ascii(None, file_header.generate()) + LINE_SEPARATOR)
+        for batch_number, (key, batch_entries) in enumerate(entries.items(), start=1):
+            batch = ACHBatch(key, first_records[key])
+            batch.spool.close()  # Entries come from the cache, not from the spool
+            batch.totals = batches[key][1]
+            batch_header = batch.header(batch_number, originating_dfi)
+            ach_file.write(check_ascii(None, batch_header.generate()) + LINE_SEPARATOR)
+            ach_file.writelines(f"{cached[1]}{entry_number!s:0>7.7}{LINE_SEPARATOR}" for entry_number, cached in batch_entries)
+            ach_file.write(batch.control(batch_number, originating_dfi, batch_header.getServiceClassCode(batch_header.transactionType)).generate() + LINE_SEPARATOR)
+            file_totals.merge(batch.totals)
+
+        line_count = 2 + 2 * len(entries) + file_totals.entryAddendaCount
+        file_control = ACH_FileControlRecord(
+            batchCount=len(entries),
+            blockCount=(line_count + 9) // 10,
+            entryAddendaCount=file_totals.entryAddendaCount,
+            entryHash=file_totals.formattedEntryHash(),
+            totalDebitAmount=str(file_totals.totalDebitAmount),
+            totalCreditAmount=str(file_totals.totalCreditAmount)
+        )
+        ach_file.write(file_control.generate() + LINE_SEPARATOR)
+        ach_file.writelines([PADDING_LINE + LINE_SEPARATOR] * ((10 - line_count % 10) % 10))
+
+    return {
+        "entries"               : file_totals.entryAddendaCount,
+        "batches"               : len(entries),
+        "total_debit_cents"     : file_totals.totalDebitAmount,
+        "total_credit_cents"    : file_totals.totalCreditAmount,
+        "entry_hash"            : file_totals.formattedEntryHash(),
+    }
+
+def row_totals(cached):
+    """ACHTotals of one cached row."""
+    totals = ACHTotals()
+    totals.entryAddendaCount, totals.entryHash = 1, cached[2]
+    if cached[4]:
+        totals.totalDebitAmount = cached[3]
+    else:
+        totals.totalCreditAmount = cached[3]
+    return totals
+
+def regenerate(csv_file_path, ach_file_path, cachePath=None):
+    """
+    Generate the ACH file of a payload CSV, reusing what the last run over the same CSV rendered.
+
+    Every row is hashed. A row seen in the last run reuses its cached entry, with only its entry
+    number (trace) formatted again; new or changed rows are parsed, validated and rendered. Batch
+    controls come from the cached partial sums of each batch, adjusted by the rows that were added
+    or removed, and the cache is updated with the changed rows only. A re-run after a small
+    correction therefore renders, and writes to the cache, in proportion to the change; the CSV
+    is still read and hashed, and the ACH file written, in full.
+
+    The output is the same as a full generation (convert_csv_file) of the CSV.
+
+    Args:
+        csv_file_path (str): Path to the payload CSV file.
+        ach_file_path (str): Path of the ACH file to write. A partially written file is removed on failure.
+        cachePath (str): Path of the row cache; defaults to '<csv_file_path>.achcache'.
+
+    Returns:
+        dict: Entry count, batch count, debit/credit totals in cents and entry hash of the file,
+              with the number of entries reused from the cache and rendered in this run.
+    """
+    with open(csv_file_path, mode='r', newline='') as csv_file, RowCache(cachePath or csv_file_path + CACHE_SUFFIX) as cache:
+        reader = csv.reader(csv_file, delimiter=',')
+        header = next(reader, None)
+        rows = filter(None, reader)  # Blank lines are skipped, as csv.DictReader does
+        first_row = next(rows, None)
+        if not header or first_row is None:
+            raise ValueError("No records found to generate the ACH file.")
+        first_record = row_record(header, first_row)
+        originating_dfi = first_record['ImmediateDestinationRoutingNumber']
+
+        cached_rows, batches, repeated = cache.load("\x1f".join(header + [str(originating_dfi)]))
+        batch_keys = {batch_id: key for key, (batch_id, _) in batches.items()}
+        inserted = {}           # Rows rendered in this run: hash -> (batch id, prefix, entry hash, cents, debit)
+        counts = {}             # Hash -> occurrences in this run
+        entries = {}            # Batch key -> [(entry number, cached row)], batches in order of their first row
+        first_records = {}      # Batch key -> record of its first row, for the batch header
+
+        for entry_number, row in enumerate(chain((first_row,), rows), start=1):
+            current_hash = row_hash(row)
+            cached = cached_rows.get(current_hash) or inserted.get(current_hash)
+            if cached is None:
+                record = row_record(header, row)
+                totals = ACHTotals()
+                try:
+                    line = render_record(entry_number, record, originating_dfi, totals)
+                except (ValueError, KeyError, TypeError) as e:
+                    raise ValueError(f"Entry {entry_number}: {e}")
+                key = batch_key(record)
+                if key not in batches:
+                    batches[key] = (max(batch_keys, default=0) + 1, ACHTotals())
+                    batch_keys[batches[key][0]] = key
+                cached = inserted[current_hash] = (
+                    batches[key][0], line[:ENTRY_PREFIX_LENGTH], totals.entryHash,
+                    totals.totalDebitAmount + totals.totalCreditAmount, record['TransactionType'] == 'Debit'
+                )
+            count = counts[current_hash] = counts.get(current_hash, 0) + 1
+            if count == 2:
+                repeated.add(current_hash)
+
+            key = batch_keys[cached[0]]
+            batch_entries = entries.get(key)
+            if batch_entries is None:
+                batch_entries = entries[key] = []
+                first_records[key] = row_record(header, row)
+            batch_entries.append((entry_number, cached))
+
+        # Rows whose number of occurrences changed: new, removed, or repeated in either run
+        removed = cached_rows.keys() - counts.keys()
+        changes = {row_hash: (counts[row_hash], 0) for row_hash in inserted}
+        changes.update((row_hash, (0, cached_rows[row_hash][5])) for row_hash in removed)
+        changes.update((row_hash, (counts[row_hash], cached_rows[row_hash][5])) for row_hash in repeated
+                       if row_hash in cached_rows and row_hash not in removed and counts[row_hash] != cached_rows[row_hash][5])
+
+        # Adjust the cached partial sums of each batch by those rows only
+        for changed_hash, (count, previous_count) in changes.items():
+            cached = inserted.get(changed_hash) or cached_rows[changed_hash]
+            change = count - previous_count
+            totals = batches[batch_keys[cached[0]]][1]
+            totals.entryAddendaCount += change
+            totals.entryHash += change * cached[2]
+            if cached[4]:
+                totals.totalDebitAmount += change * cached[3]
+            else:
+                totals.totalCreditAmount += change * cached[3]
+
+        # Partial sums that disagree with the rows (e.g. a cache left by an interrupted save) are rebuilt
+        for key, batch_entries in entries.items():
+            if batches[key][1].entryAddendaCount != len(batch_entries):
+                logEvent(logger, logging.WARNING, "incremental_totals_rebuilt", cache=cache.path, batch=batches[key][0])
+                batches[key] = (batches[key][0], ACHTotals())
+                for _, cached in batch_entries:
+                    batches[key][1].merge(row_totals(cached))
+
+        try:
+            summary = write_file(ach_file_path, first_record, originating_dfi, entries, first_records, batches)
+        except BaseException:
+            if os.path.exists(ach_file_path):
+                os.remove(ach_file_path)
+            raise
+        cache.save(inserted, {row_hash: count for row_hash, (count, _) in changes.items()}, removed, batches)
+
+    reused = summary["entries"] - sum(counts[row_hash] for row_hash in inserted)
+    logEvent(logger, logging.INFO, "incremental_regeneration", csv=csv_file_path, reused=reused, rendered=len(inserted), removed=len(removed))
+    summary.update({"reused": reused, "rendered": summary["entries"] - reused})
+    return summary
@@ -0,0 +1,108 @@
+import json, sys, time
+from contextlib import contextmanager
+
+
+class StageStats:
+    """Accumulated measurements of one pipeline stage."""
+
+    def __init__(self, name):
+        self.name               = name
+        self.calls              = 0
+        self.seconds            = 0.0
+        self.rows               = 0
+        self.bytes              = 0
+        self.allocatedBlocks    = 0     # Net change in sys.getallocatedblocks() while the stage ran
+
+    def add(self, seconds, rows=0, bytes=0, allocatedBlocks=0):
+        self.calls              += 1
+        self.seconds            += seconds
+        self.rows               += rows
+        self.bytes              += bytes
+        self.allocatedBlocks    += allocatedBlocks
+
+    def to_dict(self):
+        return {
+            "stage"             : self.name,
+            "calls"             : self.calls,
+            "seconds"           : round(self.seconds, 6),
+            "rows"              : self.rows,
+            "bytes"             : self.bytes,
+            "allocated_blocks"  : self.allocatedBlocks,
+        }
+
+
+class Instrumentation:
+    """
+    Opt-in per-stage timing and counters for the generation pipeline.
+
+    Stages are aggregated by name (wall time, calls, rows, bytes written and allocated
+    blocks), so the cost is a few counters per measured step rather than per field.
+    ACHFileGenerator records its render, padding and write stages into the instance it
+    is given; callers add their own stages (CSV parse, validation, payload mapping)
+    with ``stage`` or ``iterate``.
+    """
+
+    def __init__(self, callback=None):
+        """
+        :param callback: Optional callable receiving the summary dictionary when the
+                         generation finishes (see ``finish``).
+        """
+        self.callback   = callback
+        self.stages     = {}    # Stage name -> StageStats, in the order the stages first ran
+        self.started    = time.perf_counter()
+
+    def add(self, name, seconds, rows=0, bytes=0, allocatedBlocks=0):
+        """Record one measurement of a stage."""
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(name)
+        stats.add(seconds, rows, bytes, allocatedBlocks)
+
+    @contextmanager
+    def stage(self, name, rows=0, bytes=0):
+        """Measure the wall time and allocated blocks of the enclosed code as one call of a stage."""
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, rows, bytes, sys.getallocatedblocks() - blocks)
+
+    def iterate(self, name, iterable):
+        """
+        Yield from an iterable, timing only the time spent producing each item (e.g. parsing a CSV row),
+        not the time the consumer spends on it. Every item counts as one row.
+        """
+        iterator = iter(iterable)
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(name)
+        stats.calls += 1
+        perf_counter = time.perf_counter
+        while True:
+            start = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                stats.seconds += perf_counter() - start
+                return
+            stats.seconds += perf_counter() - start
+            stats.rows += 1
+            yield item
+
+    def summary(self):
+        """Measurements of every stage so far, as a JSON-serialisable dictionary."""
+        return {
+            "total_seconds" : round(time.perf_counter() - self.started, 6),
+            "stages"        : [stats.to_dict() for stats in self.stages.values()],
+        }
+
+    def to_json(self):
+        return json.dumps(self.summary(), indent=4)
+
+    def finish(self):
+        """Build the summary and pass it to the callback, if any. Returns the summary."""
+        summary = self.summary()
+        if self.callback is not None:
+            self.callback(summary)
+        return summary
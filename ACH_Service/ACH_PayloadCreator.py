@@ -1,19 +1,16 @@
-import sys, json, os
+import sys, os, logging
 from datetime import datetime
 
 # Add the parent directory of the current file to the system path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from ACHGenerationLogic import ACHFileGenerator
-from ACH_Constant.Constant import STANDARD_ENTRY_CLASS_MAPPING
+from ACH_Service.ACH_Transaction import ACHOriginator, ACHTransaction
+from ACH_Util.Logger import getLogger, logEvent, rowSampleInterval
 
-ACCOUNTING_SYSTEM = 'XERO'
+logger = getLogger("payload")
 
 def preparePayload(companyDetail, transactionalDetail):
     """Prepare ACH payload from company and transaction details."""
-    print("Inside prepare ach payload")
-    print('"Inside prepare ach payload" company_data: ' + json.dumps(companyDetail, indent=4))
-    print(f"Type of transactionalDetail: {type(transactionalDetail)}")
-    print(f"Content of transactionalDetail: {transactionalDetail}")
+    logEvent(logger, logging.DEBUG, "prepare_payload", company=companyDetail, transactionalDetailType=type(transactionalDetail).__name__)
 
     # Ensure transactionalDetail is always a list of dictionaries
     if isinstance(transactionalDetail, dict):
@@ -22,39 +19,25 @@ def preparePayload(companyDetail, transactionalDetail):
     if not isinstance(transactionalDetail, list):
         raise ValueError("transactionalDetail must be a list or a dictionary")
 
-    payloads = []
-
-    for transaction in transactionalDetail:
+    return list(iterPayload(companyDetail, transactionalDetail))
+
+
+def iterPayload(companyDetail, transactionalDetail):
+    """
+    Lazily map transaction details to ACH payloads, one transaction at a time.
+    Accepts any iterable of transaction dictionaries (e.g. rows streamed from a CSV),
+    so it can feed ACHFileGenerator without materialising the payload list.
+    Each payload is an ACHTransaction holding only its per-row fields; the company
+    fields are shared through a single ACHOriginator.
+    Generated payloads are logged at DEBUG for a sample of rows (see ACH_Util.Logger).
+    """
+    originator = ACHOriginator.from_company(companyDetail)
+    sample_every = rowSampleInterval(logger)
+    for index, transaction in enumerate(transactionalDetail):
         if not isinstance(transaction, dict):
             raise ValueError("Each transaction must be a dictionary")
-        
-        if ACCOUNTING_SYSTEM == "XERO":
-            receiver_bank_details = transaction.get("Receiver Bank Details", "")
-            if len(receiver_bank_details) >= 9:
-                receiver_routing_number = receiver_bank_details[:9]
-                receiver_account_number = receiver_bank_details[9:]
-                transaction["Receiver Routing Number"] = receiver_routing_number
-                transaction["Receiver Account Number"] = receiver_account_number
-        payload = {
-            "ImmediateOrigin": companyDetail.get("Company Financial Services", ""),
-            "ImmediateDestination": companyDetail.get("Bank Name", ""),
-            "ImmediateOriginRoutingNumber": companyDetail.get("Company Routing Number", ""),
-            "ImmediateDestinationRoutingNumber": companyDetail.get("Bank Routing Number", ""),
-            "TransactionType": transaction.get("Transaction Type", "Credit"),   
-            "CompanyName": companyDetail.get("Company Name", ""),
-            "CompanyId": companyDetail.get("Company Id", ""),
-            "ReceiverName": transaction.get("Receiver Name", ""),
-            "ReceivingBankAccountNumber": transaction.get("Receiver Account Number", ""),
-            "ReceivingDFI": transaction.get("Receiver Routing Number", ""),
-            "OriginatingBankRoutningNumber": companyDetail.get("Bank Routing Number", ""),
-            "StandardEntryClassCode": STANDARD_ENTRY_CLASS_MAPPING.get(transaction.get("Standard Entry Class Code"), "CCD"),
-            "EntryDescription": transaction.get("Entry Description", "VENDOR"),
-            "Amount": transaction.get("Amount", ""),
-            "TransactionIdentifier": transaction.get("Transaction Identifier", ""),
-            "EntryNumber": transaction.get("Entry Number", "1"),
-            "Reference": transaction.get("Reference", "")
-        }   
-        print('Generated payload: ' + json.dumps(payload, indent=4))
-        payloads.append(payload)
-
-    return payloads
\ No newline at end of file
+
+        payload = ACHTransaction.from_transaction(transaction, originator)
+        if sample_every and index % sample_every == 0:
+            logEvent(logger, logging.DEBUG, "payload", row=index + 1, payload=payload.to_payload())
+        yield payload
@@ -0,0 +1,235 @@
+import mmap, os, sys
+
+# Add the parent directory of the current file to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ACH_FileFormat.ACH_1FileHeader import ACH_FileHeader
+from ACH_FileFormat.ACH_2BatchHeader import ACH_BatchHeader
+from ACH_FileFormat.ACH_3EntryDetail import ACH_EntryDetail
+from ACH_FileFormat.ACH_5BatchControlRecord import ACH_BatchControlRecord
+from ACH_FileFormat.ACH_6FileControlRecord import ACH_FileControlRecord
+
+RECORD_LENGTH = 94
+RECORD_TYPES = b'156789'  # File header, batch header, entry, addenda, batch control, file control
+
+def field_offsets(configs):
+    """Map each field name of a layout to its (start, end) offsets; the first occurrence of a name wins."""
+    offsets = {}
+    start = 0
+    for config in configs:
+        offsets.setdefault(config.name, (start, start + config.length))
+        start += config.length
+    return offsets
+
+# Field offsets per record type code, derived from the same layouts the generator uses
+RECORD_FIELDS = {
+    b'1': field_offsets(ACH_FileHeader.all_fields),
+    b'5': field_offsets(ACH_BatchHeader.all_fields),
+    b'6': field_offsets(ACH_EntryDetail.all_fields),
+    b'7': {
+        "Record Type Code"              : (0, 1),
+        "Addenda Type Code"             : (1, 3),
+        "Payment Related Information"   : (3, 83),
+        "Addenda Sequence Number"       : (83, 87),
+        "Entry Detail Sequence Number"  : (87, 94),
+    },
+    b'8': field_offsets(ACH_BatchControlRecord.all_fields),
+    b'9': field_offsets(ACH_FileControlRecord.all_fields),
+}
+TRACE_NUMBER = (79, 94)  # Originating DFI + Entry Number of an Entry Detail record
+
+
+class ACHRecord:
+    """One fixed-width record of an ACH file. Fields are decoded only when accessed."""
+
+    def __init__(self, index, data):
+        self.index  = index     # Record (line) number in the file, starting at 0
+        self.data   = data      # Raw 94 bytes
+
+    @property
+    def recordType(self):
+        return self.data[:1].decode('ascii')
+
+    def field(self, name):
+        """
+        Decode one field by name, using the layout of this record's type.
+        :return: The field value with surrounding blanks removed.
+        """
+        start, end = RECORD_FIELDS[self.data[:1]][name]
+        return self.data[start:end].decode('ascii').strip()
+
+    def __getitem__(self, name):
+        return self.field(name)
+
+    def fields(self):
+        """Decode every field of the record into a dictionary."""
+        return {name: self.field(name) for name in RECORD_FIELDS.get(self.data[:1], {})}
+
+    def __str__(self):
+        return self.data.decode('ascii')
+
+
+class ACHBatchIndex:
+    """Record positions of one batch: its header, its entries/addenda, and its control."""
+
+    def __init__(self, batchNumber, headerIndex, controlIndex):
+        self.batchNumber    = batchNumber
+        self.headerIndex    = headerIndex
+        self.controlIndex   = controlIndex
+
+    @property
+    def entryCount(self):
+        return self.controlIndex - self.headerIndex - 1
+
+
+class ACHFileReader:
+    """
+    Random-access reader over a generated ACH file.
+
+    The file is memory-mapped rather than read. Because every record is a fixed
+    94-byte line, record ``i`` starts at ``i * stride``. Batches are indexed with a
+    scan for record type codes, and fields are decoded lazily through ACHRecord.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.file = open(file_path, 'rb')
+        try:
+            if os.fstat(self.file.fileno()).st_size < RECORD_LENGTH:
+                raise ValueError(f"'{file_path}' is not an ACH file: it is shorter than one record.")
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self.file.close()
+            raise
+
+        # Records are separated by '\r\n' (as generated) or '\n'
+        separator_length = 0
+        if self.mm[RECORD_LENGTH:RECORD_LENGTH + 2] == b'\r\n':
+            separator_length = 2
+        elif self.mm[RECORD_LENGTH:RECORD_LENGTH + 1] == b'\n':
+            separator_length = 1
+        self.separator = self.mm[RECORD_LENGTH:RECORD_LENGTH + separator_length]
+        self.stride = RECORD_LENGTH + separator_length
+        self.recordCount = (len(self.mm) + separator_length) // self.stride
+        self._batches = None
+        try:
+            self._check_layout()
+        except ValueError:
+            self.close()
+            raise
+
+    def _check_layout(self):
+        """
+        Check that the file is made of fixed-width records, as random access relies on:
+        a size that is a whole number of records, a separator after every record and a known
+        record type code at the start of each. Each check is one strided slice of the mapping.
+        :raises ValueError: If a record is not at its offset, e.g. after a multi-byte character.
+        """
+        size = len(self.mm)
+        if size % self.stride not in (0, RECORD_LENGTH):
+            raise ValueError(f"'{self.file_path}' is not a fixed-width ACH file: its size ({size} bytes) is not a whole "
+                             f"number of {RECORD_LENGTH}-byte records. It may contain non-ASCII characters.")
+        record_types = self.mm[0::self.stride]
+        if record_types.translate(None, RECORD_TYPES):
+            index = next(index for index, code in enumerate(record_types) if code not in RECORD_TYPES)
+            raise ValueError(f"'{self.file_path}' is not a fixed-width ACH file: record {index} has an unknown record type {record_types[index:index + 1]!r}.")
+        for position, character in enumerate(self.separator):
+            separators = self.mm[RECORD_LENGTH + position::self.stride]
+            if separators.count(character) != len(separators):
+                index = next(index for index, code in enumerate(separators) if code != character)
+                raise ValueError(f"'{self.file_path}' is not a fixed-width ACH file: record {index} is not followed by a line separator.")
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.recordCount
+
+    def record(self, index):
+        """Return the record at the given position (negative indexes count from the end)."""
+        if index < 0:
+            index += self.recordCount
+        if not 0 <= index < self.recordCount:
+            raise IndexError(f"Record {index} is out of range.")
+        offset = index * self.stride
+        return ACHRecord(index, self.mm[offset:offset + RECORD_LENGTH])
+
+    def record_type(self, index):
+        """Record type code of the record at the given position, without decoding it."""
+        return self.mm[index * self.stride:index * self.stride + 1]
+
+    def __iter__(self):
+        for index in range(self.recordCount):
+            yield self.record(index)
+
+    def _find_records(self, recordType):
+        """Yield the positions of every record of one type, using mmap.find rather than a per-record loop."""
+        if self.record_type(0) == recordType:
+            yield 0
+        needle = self.separator + recordType
+        offset = self.mm.find(needle)
+        while offset != -1:
+            start = offset + len(self.separator)
+            if start % self.stride == 0:
+                yield start // self.stride
+            offset = self.mm.find(needle, offset + 1)
+
+    def batches(self):
+        """Index the batches of the file; computed once, on first use."""
+        if self._batches is None:
+            controls = list(self._find_records(b'8'))
+            self._batches = []
+            for header_index, control_index in zip(self._find_records(b'5'), controls):
+                batch_number = int(self.record(header_index).field("Batch Number"))
+                self._batches.append(ACHBatchIndex(batch_number, header_index, control_index))
+        return self._batches
+
+    def batch(self, batchNumber):
+        """Return the index of a batch by its batch number."""
+        for batch in self.batches():
+            if batch.batchNumber == batchNumber:
+                return batch
+        raise KeyError(f"Batch {batchNumber} not found.")
+
+    def iter_batch(self, batchNumber):
+        """Yield the entry (and addenda) records of a single batch."""
+        batch = self.batch(batchNumber)
+        for index in range(batch.headerIndex + 1, batch.controlIndex):
+            yield self.record(index)
+
+    def _trace_at(self, index):
+        """Trace number of the entry at index, or of the entry an addenda record at index belongs to."""
+        while self.record_type(index) == b'7':
+            index -= 1
+        offset = index * self.stride
+        return int(self.mm[offset + TRACE_NUMBER[0]:offset + TRACE_NUMBER[1]]), index
+
+    def find_entry(self, traceNumber):
+        """
+        Look up an Entry Detail record by trace number.
+        Entries are in ascending trace order within a batch, so each batch is binary searched.
+
+        :param traceNumber: The 15-digit trace number, or just the entry number (last 7 digits).
+        :return: The matching ACHRecord, or None.
+        """
+        trace_number = int(traceNumber)
+        entry_number_only = trace_number < 10000000
+        for batch in self.batches():
+            low, high = batch.headerIndex + 1, batch.controlIndex
+            while low < high:
+                middle = (low + high) // 2
+                trace, entry_index = self._trace_at(middle)
+                key = trace % 10000000 if entry_number_only else trace
+                if key == trace_number:
+                    return self.record(entry_index)
+                if key < trace_number:
+                    low = middle + 1
+                else:
+                    high = entry_index
+        return None
@@ -0,0 +1,106 @@
+import json, os, sys
+from collections import OrderedDict
+
+# Add the parent directory of the current file to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ACH_FileFormat.ACH_3EntryDetail import ACH_EntryDetail
+
+DEFAULT_MAX_SIZE = 100000
+CACHE_FILE_VERSION = 1
+
+# Entry Detail slots around the per-entry fields (see ACH_EntryDetail.all_fields)
+RECEIVER_PREFIX = slice(0, 29)      # Record type, transaction code, receiving DFI, check digit, account number
+RECEIVER_SUFFIX = slice(54, 87)     # Receiver name, discretionary data, addenda indicator, originating DFI
+
+
+class ReceiverSegmentCache:
+    """
+    Bounded LRU cache of pre-rendered Entry Detail segments of recurring receivers.
+
+    The receiver-dependent parts of an entry (transaction code, routing number and check digit,
+    account number, name) and the originating DFI are rendered once per receiver. An entry for a
+    cached receiver only formats its amount, transaction identifier and entry number around them.
+    The output is the same as ACH_EntryDetail.render.
+
+    The cache can be saved to a JSON file and loaded by the next run, so a weekly payroll
+    starts with its receivers already rendered.
+    """
+
+    def __init__(self, maxSize=DEFAULT_MAX_SIZE):
+        """
+        :param maxSize: Maximum number of receivers kept; the least recently used are evicted.
+        """
+        self.maxSize    = maxSize
+        self.segments   = OrderedDict()     # (type, routing, account, name, originating DFI) -> (prefix, suffix)
+        self.hits       = 0
+        self.misses     = 0
+        self.evictions  = 0
+
+    def __len__(self):
+        return len(self.segments)
+
+    def render(self, transactionType, receivingBankRoutingNumber, receivingBankAccountNumber, amountInCents,
+               transactionIdentifier, receiverName, originatingBankRoutningNumber, entryNumber):
+        """Render an Entry Detail record; same arguments and result as ACH_EntryDetail.render."""
+        key = (transactionType, receivingBankRoutingNumber, receivingBankAccountNumber, receiverName, originatingBankRoutningNumber)
+        segments = self.segments.get(key)
+        if segments is None or amountInCents is None or transactionIdentifier is None:
+            record = ACH_EntryDetail.render(transactionType, receivingBankRoutingNumber, receivingBankAccountNumber, amountInCents,
+                                            transactionIdentifier, receiverName, originatingBankRoutningNumber, entryNumber)
+            if segments is None:
+                self.misses += 1
+                if len(record) == ACH_EntryDetail.layout.length:  # Upper-casing can lengthen some non-ASCII names
+                    self.add(key, (record[RECEIVER_PREFIX], record[RECEIVER_SUFFIX]))
+            return record
+
+        self.hits += 1
+        self.segments.move_to_end(key)
+        prefix, suffix = segments
+        return f"{prefix}{amountInCents!s:0>10.10}{transactionIdentifier!s: <15.15}{suffix}{entryNumber!s:0>7.7}".upper()
+
+    def add(self, key, segments):
+        self.segments[key] = segments
+        if len(self.segments) > self.maxSize:
+            self.segments.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """Hit/miss counters of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "receivers"     : len(self.segments),
+            "max_size"      : self.maxSize,
+            "hits"          : self.hits,
+            "misses"        : self.misses,
+            "evictions"     : self.evictions,
+            "hit_rate"      : round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    @classmethod
+    def load(cls, path, maxSize=DEFAULT_MAX_SIZE):
+        """
+        Load a cache saved by save(); a missing or unreadable file gives an empty cache.
+        :param path: Path of the JSON cache file.
+        """
+        cache = cls(maxSize)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            return cache
+        if saved.get("version") == CACHE_FILE_VERSION:
+            # Saved least recently used first, so the most recent receivers survive a smaller maxSize
+            for key, prefix, suffix in saved.get("segments", []):
+                cache.add(tuple(key), (prefix, suffix))
+        cache.evictions = 0
+        return cache
+
+    def save(self, path):
+        """Save the cached segments, least recently used first, replacing the file atomically."""
+        temporary_path = path + ".tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump({
+                "version"   : CACHE_FILE_VERSION,
+                "segments"  : [[list(key), prefix, suffix] for key, (prefix, suffix) in self.segments.items()],
+            }, file)
+        os.replace(temporary_path, path)
@@ -0,0 +1,125 @@
+import os, sys, struct, logging
+from array import array
+
+# Add the parent directory of the current file to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ACH_FileFormat.ACH_3EntryDetail import ACH_EntryDetail
+from ACH_Util.Logger import getLogger, logEvent
+
+logger = getLogger("routing_directory")
+
+SIDECAR_SUFFIX = ".idx"
+SIDECAR_MAGIC = b"ACHRDIX1"
+SIDECAR_HEADER = struct.Struct("<8sII")  # Magic, active count, inactive count
+
+# FedACH participant directory (fixed-width, 155 characters per line)
+FEDACH_ROUTING_NUMBER = slice(0, 9)
+FEDACH_RECORD_TYPE_CODE = 19        # '2' = use the new routing number instead
+FEDACH_INSTITUTION_STATUS_CODE = 148  # '1' = receives Gov/Comm entries
+FEDACH_MIN_LINE_LENGTH = 149
+
+
+class RoutingDirectory:
+    """
+    Index of receiving DFI routing numbers from a local FedACH participant directory.
+
+    The directory is parsed once and cached next to it as a binary sidecar of two sorted
+    uint32 arrays (active and inactive routing numbers), which later loads read directly.
+    Lookups go through in-memory sets, so checking a routing number is O(1).
+    """
+
+    def __init__(self, activeRoutingNumbers, inactiveRoutingNumbers):
+        self.active     = set(activeRoutingNumbers)
+        self.inactive   = set(inactiveRoutingNumbers) - self.active
+
+    def __len__(self):
+        return len(self.active) + len(self.inactive)
+
+    @classmethod
+    def load(cls, directory_path):
+        """
+        Load the directory, from its sidecar index when that is newer than the directory file.
+        :param directory_path: Path to the FedACH directory file (e.g. FedACHdir.txt).
+        """
+        sidecar_path = directory_path + SIDECAR_SUFFIX
+        if os.path.isfile(sidecar_path) and os.path.getmtime(sidecar_path) >= os.path.getmtime(directory_path):
+            try:
+                return cls.read_sidecar(sidecar_path)
+            except ValueError:
+                pass  # Stale or damaged sidecar; rebuild it below
+        directory = cls.parse(directory_path)
+        try:
+            directory.write_sidecar(sidecar_path)
+        except OSError as e:
+            logEvent(logger, logging.WARNING, "routing_directory_index_not_cached", path=sidecar_path, error=str(e))
+        return directory
+
+    @classmethod
+    def parse(cls, directory_path):
+        """
+        Parse a FedACH directory file. Lines shorter than the FedACH layout are read as a
+        plain list of active routing numbers, one per line.
+        """
+        active = array("I")
+        inactive = array("I")
+        with open(directory_path, mode="r", encoding="latin-1") as file:
+            for line in file:
+                routing_number = line[FEDACH_ROUTING_NUMBER]
+                if not routing_number.isdigit():
+                    continue
+                if len(line.rstrip("\r\n")) < FEDACH_MIN_LINE_LENGTH:
+                    active.append(int(routing_number))
+                elif line[FEDACH_RECORD_TYPE_CODE] != "2" and line[FEDACH_INSTITUTION_STATUS_CODE] == "1":
+                    active.append(int(routing_number))
+                else:
+                    inactive.append(int(routing_number))
+        return cls(active, inactive)
+
+    @classmethod
+    def read_sidecar(cls, sidecar_path):
+        """Load the index from its binary sidecar."""
+        with open(sidecar_path, "rb") as file:
+            header = file.read(SIDECAR_HEADER.size)
+            if len(header) != SIDECAR_HEADER.size:
+                raise ValueError(f"'{sidecar_path}' is not a routing directory index.")
+            magic, active_count, inactive_count = SIDECAR_HEADER.unpack(header)
+            if magic != SIDECAR_MAGIC:
+                raise ValueError(f"'{sidecar_path}' is not a routing directory index.")
+            active = array("I")
+            inactive = array("I")
+            try:
+                active.fromfile(file, active_count)
+                inactive.fromfile(file, inactive_count)
+            except EOFError:
+                raise ValueError(f"'{sidecar_path}' is truncated.")
+        return cls(active, inactive)
+
+    def write_sidecar(self, sidecar_path):
+        """Write the index as a binary sidecar (replaced atomically)."""
+        active = array("I", sorted(self.active))
+        inactive = array("I", sorted(self.inactive))
+        temp_path = sidecar_path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(SIDECAR_HEADER.pack(SIDECAR_MAGIC, len(active), len(inactive)))
+            active.tofile(file)
+            inactive.tofile(file)
+        os.replace(temp_path, sidecar_path)
+
+    def check(self, routingNumber):
+        """
+        Check a receiving DFI routing number against the directory.
+        8-digit routing numbers are completed with their calculated check digit.
+
+        :return: None if the routing number is active, otherwise the reason it is rejected.
+        """
+        routing_number = str(routingNumber).strip()
+        if not routing_number.isdigit() or len(routing_number) not in (8, 9):
+            return f"Routing number '{routing_number}' must be 8 or 9 digits."
+        if len(routing_number) == 8:
+            routing_number += str(ACH_EntryDetail.calculateCheckDigit(routing_number))
+        key = int(routing_number)
+        if key in self.active:
+            return None
+        if key in self.inactive:
+            return f"Routing number '{routing_number}' is inactive in the FedACH directory."
+        return f"Routing number '{routing_number}' is not in the FedACH directory."
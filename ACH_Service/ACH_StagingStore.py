@@ -0,0 +1,248 @@
+import os, sys, sqlite3
+from datetime import datetime
+
+# Add the parent directory of the current file to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ACH_Constant.Constant import STANDARD_ENTRY_CLASS_MAPPING
+from ACH_Service.ACH_CSVHandler import read_csv_data, validate_transaction
+from ACH_Service.ACH_Generator import ACHFileGenerator
+from ACH_Service.ACH_Transaction import ACHTransaction
+
+INGEST_BATCH_SIZE = 5000    # Rows per executemany call
+MAX_REPORTED_ISSUES = 20
+STAGED = "staged"
+GENERATED = "generated"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id                      INTEGER PRIMARY KEY,
+    client                  TEXT NOT NULL,
+    value_date              TEXT NOT NULL,      -- Effective entry date (YYMMDD); empty for the generation date
+    status                  TEXT NOT NULL,
+    source                  TEXT NOT NULL,      -- CSV file the row was loaded from
+    generated_file          TEXT,
+    transaction_type        TEXT NOT NULL,
+    receiver_name           TEXT NOT NULL,
+    account_number          TEXT NOT NULL,
+    routing_number          TEXT NOT NULL,
+    standard_entry_class    TEXT NOT NULL,
+    entry_description       TEXT NOT NULL,
+    amount_cents            INTEGER NOT NULL,
+    transaction_identifier  TEXT NOT NULL,
+    reference               TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_selection ON transactions (status, client, value_date);
+"""
+
+COLUMNS = (
+    "transaction_type", "receiver_name", "account_number", "routing_number", "standard_entry_class",
+    "entry_description", "amount_cents", "transaction_identifier", "reference", "value_date",
+)
+
+
+def validate_value_date(valueDate):
+    """
+    Check a value date (effective entry date) given as YYMMDD; empty means the generation date.
+    :raises ValueError: If the value date is not a valid YYMMDD date.
+    """
+    if valueDate:
+        try:
+            valid = len(valueDate) == 6 and valueDate.isdigit() and datetime.strptime(valueDate, "%y%m%d")
+        except ValueError:
+            valid = False
+        if not valid:
+            raise ValueError(f"Value date '{valueDate}' must be a valid date as YYMMDD.")
+
+def staged_row(row, amountInCents):
+    """
+    Map a row read by read_csv_data, validated with validate_transaction, to the staged
+    transaction columns (see COLUMNS), the same way ACHTransaction.from_transaction maps
+    transaction details.
+    """
+    # Receiver bank details hold the routing number followed by the account number
+    receiver_bank_details = (row.get("Receiver Bank Details") or "").strip()
+    if len(receiver_bank_details) >= 9:
+        routing_number, account_number = receiver_bank_details[:9], receiver_bank_details[9:]
+    else:
+        routing_number = (row.get("Receiver Routing Number") or "").strip()
+        account_number = (row.get("Receiver Account Number") or "").strip()
+    return (
+        row.get("Transaction Type") or "Credit",
+        row.get("Receiver Name") or "",
+        account_number,
+        routing_number,
+        STANDARD_ENTRY_CLASS_MAPPING.get(row.get("Standard Entry Class Code"), "CCD"),
+        row.get("Entry Description") or "VENDOR",
+        amountInCents,
+        row.get("Transaction Identifier") or "",
+        row.get("Reference") or "",
+    )
+
+
+class ACHStagingStore:
+    """
+    Local SQLite store where the transactions of many upstream CSVs are staged until a cutoff,
+    then selected (by client, value date and status) and streamed into ACHFileGenerator.
+
+    Rows are validated like a CSV upload and inserted with batched executemany calls inside one
+    transaction per CSV, so a file is staged completely or not at all. Amounts are parsed once,
+    on ingest, and stored as cents.
+    Selections are served by an index on (status, client, value date) and read through a
+    cursor, one row at a time, so a run never holds the staged rows in a Python list.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Path of the SQLite database; created on first use.
+        """
+        self.path       = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def ingest(self, accountingSystem, file_path, client="", valueDate="", routingDirectory=None):
+        """
+        Stage the transactions of a CSV file.
+
+        Args:
+            accountingSystem (str): 'Xero' or 'Default', as for read_csv_data.
+            file_path (str): Path to the CSV file.
+            client (str): Client the transactions belong to.
+            valueDate (str): Effective entry date (YYMMDD) of the transactions; empty for the generation date.
+            routingDirectory (RoutingDirectory): Optional FedACH directory to reject unknown or inactive routing numbers.
+
+        Returns:
+            int: Number of staged transactions.
+
+        Raises:
+            ValueError: If the value date is invalid, or any row fails validation (validate_transaction),
+                        listing the issues; nothing is staged then.
+        """
+        validate_value_date(valueDate)
+        first_row_number = 1 if accountingSystem == 'Xero' else 2  # Generic CSVs have a header row
+        fixed = (client, valueDate, STAGED, file_path)
+        insert = (
+            f"INSERT INTO transactions (client, value_date, status, source, {', '.join(COLUMNS[:-1])}) "
+            f"VALUES ({', '.join('?' * (len(COLUMNS) + 3))})"
+        )
+
+        count = 0
+        batch = []
+        issues = []
+        with self.connection:  # One transaction: rolled back if any row is rejected
+            for row_num, row in enumerate(read_csv_data(accountingSystem, file_path), start=first_row_number):
+                amount_in_cents = validate_transaction(row_num, row, routingDirectory, issues)
+                if issues:
+                    continue  # Keep collecting the issues of the other rows; nothing will be staged
+                batch.append(fixed + staged_row(row, amount_in_cents))
+                if len(batch) >= INGEST_BATCH_SIZE:
+                    self.connection.executemany(insert, batch)
+                    count += len(batch)
+                    batch = []
+            if issues:
+                more = f" (and {len(issues) - MAX_REPORTED_ISSUES} more)" if len(issues) > MAX_REPORTED_ISSUES else ""
+                raise ValueError("; ".join(issue.rstrip(".") for issue in issues[:MAX_REPORTED_ISSUES]) + more)
+            if batch:
+                self.connection.executemany(insert, batch)
+                count += len(batch)
+        return count
+
+    def selection(self, client=None, valueDate=None, status=STAGED, upToId=None):
+        """WHERE clause and parameters selecting transactions; None leaves a criterion out."""
+        clauses, parameters = ["status = ?"], [status]
+        if client is not None:
+            clauses.append("client = ?")
+            parameters.append(client)
+        if valueDate is not None:
+            clauses.append("value_date = ?")
+            parameters.append(valueDate)
+        if upToId is not None:
+            clauses.append("id <= ?")
+            parameters.append(upToId)
+        return " AND ".join(clauses), parameters
+
+    def count(self, client=None, valueDate=None, status=STAGED):
+        where, parameters = self.selection(client, valueDate, status)
+        return self.connection.execute(f"SELECT COUNT(*) FROM transactions WHERE {where}", parameters).fetchone()[0]
+
+    def last_id(self):
+        """Id of the most recently staged transaction, used to fix a selection before generating from it."""
+        return self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]
+
+    def transactions(self, originator, client=None, valueDate=None, status=STAGED, upToId=None):
+        """
+        Stream the selected transactions as ACHTransaction records, in staging order.
+        The rows are read lazily from the cursor, so the generator can consume them as they come.
+
+        :param originator: ACHOriginator shared by the records (e.g. ACHOriginator.from_company(...)).
+        :param upToId: Only transactions staged up to this id (see last_id), to ignore rows staged meanwhile.
+        """
+        where, parameters = self.selection(client, valueDate, status, upToId)
+        # A separate cursor, so the store stays usable while the rows are streamed
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT {', '.join(COLUMNS)} FROM transactions WHERE {where} ORDER BY id", parameters)
+        for (transaction_type, receiver_name, account_number, routing_number, standard_entry_class, entry_description,
+                amount_cents, transaction_identifier, reference, value_date) in cursor:
+            yield ACHTransaction(
+                originator,
+                transaction_type,
+                receiver_name,
+                account_number,
+                routing_number,
+                standard_entry_class,
+                entry_description,
+                f"{amount_cents // 100}.{amount_cents % 100:02d}",
+                amount_cents,
+                transaction_identifier,
+                reference,
+                value_date or None,
+            )
+
+    def mark_generated(self, fileName, client=None, valueDate=None, upToId=None):
+        """
+        Mark the selected staged transactions as generated into an ACH file.
+        :return: Number of transactions marked.
+        """
+        where, parameters = self.selection(client, valueDate, STAGED, upToId)
+        with self.connection:
+            return self.connection.execute(
+                f"UPDATE transactions SET status = ?, generated_file = ? WHERE {where}", [GENERATED, fileName] + parameters
+            ).rowcount
+
+    def generate(self, ach_file_path, originator, client=None, valueDate=None, **generatorOptions):
+        """
+        Write an ACH file from the staged transactions of a selection, then mark them as generated.
+        Transactions staged while the file is written are left for the next run. A partially
+        written ACH file is removed on failure, and the transactions stay staged.
+
+        Args:
+            ach_file_path (str): Path of the ACH file to write.
+            originator (ACHOriginator): Company details of the file.
+            client (str): Only transactions of this client; None for all clients.
+            valueDate (str): Only transactions with this value date; None for all dates.
+            generatorOptions: Further ACHFileGenerator options, e.g. workers or duplicateIndex.
+
+        Returns:
+            ACHFileGenerator: The generator, with the totals of the file.
+        """
+        up_to_id = self.last_id()
+        ach_generator = ACHFileGenerator(self.transactions(originator, client, valueDate, upToId=up_to_id), **generatorOptions)
+        try:
+            with open(ach_file_path, 'w', newline='') as ach_file:
+                ach_generator.generate_to(ach_file)
+        except BaseException:
+            if os.path.exists(ach_file_path):
+                os.remove(ach_file_path)
+            raise
+        self.mark_generated(ach_file_path, client, valueDate, up_to_id)
+        return ach_generator
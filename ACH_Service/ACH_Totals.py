@@ -0,0 +1,58 @@
+MAX_BATCH_ENTRY_COUNT = 10 ** 6 - 1     # Width of the batch control Entry/Addenda Count
+MAX_FILE_ENTRY_COUNT = 10 ** 8 - 1      # Width of the file control Entry/Addenda Count
+MAX_TOTAL_AMOUNT_CENTS = 10 ** 12 - 1   # Width of the control records' total debit and credit amounts
+MAX_BATCH_COUNT = 10 ** 6 - 1           # Width of the file control Batch Count
+MAX_BLOCK_COUNT = 10 ** 6 - 1           # Width of the file control Block Count
+
+class ACHTotals:
+    """
+    Running control totals for a batch or a file.
+    Entries are added while they are rendered, so the control records need no extra pass over the records.
+    """
+
+    def __init__(self):
+        self.entryAddendaCount  = 0
+        self.entryHash          = 0     # Raw sum of the 8-digit receiving DFI identifiers
+        self.totalDebitAmount   = 0     # Cents
+        self.totalCreditAmount  = 0     # Cents
+
+    def add(self, receivingDFI, amountInCents, isDebit):
+        """
+        Account for one entry.
+
+        :param receivingDFI: Receiver's routing number (8 or 9 digits); the first 8 digits are hashed.
+        :param amountInCents: Entry amount in cents.
+        :param isDebit: True for debit entries, False for credit entries.
+        """
+        self.entryAddendaCount += 1
+        self.entryHash += int(receivingDFI[:8])
+        if isDebit:
+            self.totalDebitAmount += amountInCents
+        else:
+            self.totalCreditAmount += amountInCents
+
+    def merge(self, other):
+        """Add another set of totals (e.g. a batch into its file) into this one."""
+        self.entryAddendaCount  += other.entryAddendaCount
+        self.entryHash          += other.entryHash
+        self.totalDebitAmount   += other.totalDebitAmount
+        self.totalCreditAmount  += other.totalCreditAmount
+        return self
+
+    def checkFits(self, maxEntryCount, owner):
+        """
+        Check that the count and the totals fit their control record fields. The record layout
+        keeps only the leftmost digits of a value that is too long, which would corrupt the file.
+
+        :param maxEntryCount: MAX_BATCH_ENTRY_COUNT or MAX_FILE_ENTRY_COUNT.
+        :param owner: What the totals belong to, for the error message (e.g. "Batch 2").
+        :raises ValueError: If the entry count or a total is too large for its field.
+        """
+        if self.entryAddendaCount > maxEntryCount:
+            raise ValueError(f"{owner} has {self.entryAddendaCount} entries; its control record holds at most {maxEntryCount}.")
+        if max(self.totalDebitAmount, self.totalCreditAmount) > MAX_TOTAL_AMOUNT_CENTS:
+            raise ValueError(f"{owner} totals more than 9999999999.99 in debits or credits, which its control record cannot hold.")
+
+    def formattedEntryHash(self):
+        """Entry hash as the rightmost 10 digits of the sum, as required by the control records."""
+        return str(self.entryHash % 10000000000).zfill(10)
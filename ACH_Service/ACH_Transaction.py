@@ -0,0 +1,161 @@
+import os, sys
+from operator import itemgetter
+
+# Add the parent directory of the current file to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ACH_Constant.Constant import STANDARD_ENTRY_CLASS_MAPPING
+
+
+class ACHOriginator:
+    """
+    Company-level payload fields, shared by every transaction of a file instead of being
+    copied into each one.
+    """
+    __slots__ = (
+        "ImmediateOrigin", "ImmediateDestination", "ImmediateOriginRoutingNumber", "ImmediateDestinationRoutingNumber",
+        "CompanyName", "CompanyId", "OriginatingBankRoutningNumber",
+    )
+
+    def __init__(self, immediateOrigin, immediateDestination, immediateOriginRoutingNumber, immediateDestinationRoutingNumber,
+                 companyName, companyId, originatingBankRoutningNumber):
+        self.ImmediateOrigin                    = immediateOrigin
+        self.ImmediateDestination               = immediateDestination
+        self.ImmediateOriginRoutingNumber       = immediateOriginRoutingNumber
+        self.ImmediateDestinationRoutingNumber  = immediateDestinationRoutingNumber
+        self.CompanyName                        = companyName
+        self.CompanyId                          = companyId
+        self.OriginatingBankRoutningNumber      = originatingBankRoutningNumber
+
+    @classmethod
+    def from_company(cls, companyDetail):
+        """Build the originator from company details (as saved in the Company Details tab)."""
+        return cls(
+            companyDetail.get("Company Financial Services", ""),
+            companyDetail.get("Bank Name", ""),
+            companyDetail.get("Company Routing Number", ""),
+            companyDetail.get("Bank Routing Number", ""),
+            companyDetail.get("Company Name", ""),
+            companyDetail.get("Company Id", ""),
+            companyDetail.get("Bank Routing Number", ""),
+        )
+
+
+class ACHTransaction:
+    """
+    One payload record holding only its per-row fields, with the company-level fields
+    read through a shared ACHOriginator.
+
+    It can be used wherever a payload dictionary is expected: ``transaction['ReceiverName']``,
+    ``transaction.get('EffectiveEntryDate')`` and ``transaction['CompanyId']`` (from the
+    originator) work the same way.
+    """
+    __slots__ = (
+        "originator", "TransactionType", "ReceiverName", "ReceivingBankAccountNumber", "ReceivingDFI",
+        "StandardEntryClassCode", "EntryDescription", "Amount", "AmountInCents", "TransactionIdentifier",
+        "Reference", "EffectiveEntryDate",
+    )
+
+    def __init__(self, originator, transactionType, receiverName, receivingBankAccountNumber, receivingDFI,
+                 standardEntryClassCode, entryDescription, amount, amountInCents=None, transactionIdentifier="",
+                 reference="", effectiveEntryDate=None):
+        self.originator                 = originator
+        self.TransactionType            = transactionType
+        self.ReceiverName               = receiverName
+        self.ReceivingBankAccountNumber = receivingBankAccountNumber
+        self.ReceivingDFI               = receivingDFI
+        self.StandardEntryClassCode     = standardEntryClassCode
+        self.EntryDescription           = entryDescription
+        self.Amount                     = amount
+        self.AmountInCents              = amountInCents
+        self.TransactionIdentifier      = transactionIdentifier
+        self.Reference                  = reference
+        self.EffectiveEntryDate         = effectiveEntryDate
+
+    def __getattr__(self, name):
+        # Only called for names that are not per-row slots, i.e. the company-level fields
+        if name == "originator":
+            raise AttributeError(name)
+        return getattr(self.originator, name)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_payload(self):
+        """The equivalent payload dictionary, e.g. for logging."""
+        payload = {name: getattr(self.originator, name) for name in ACHOriginator.__slots__}
+        payload.update((name, getattr(self, name)) for name in ACHTransaction.__slots__[1:])
+        return payload
+
+    @classmethod
+    def from_transaction(cls, transaction, originator):
+        """Map transaction details (as entered in the UI or read from a CSV) to a transaction record."""
+        # Receiver bank details hold the routing number followed by the account number
+        receiver_bank_details = transaction.get("Receiver Bank Details", "")
+        if len(receiver_bank_details) >= 9:
+            receiving_dfi, account_number = receiver_bank_details[:9], receiver_bank_details[9:]
+        else:
+            receiving_dfi = transaction.get("Receiver Routing Number", "")
+            account_number = transaction.get("Receiver Account Number", "")
+        return cls(
+            originator,
+            transaction.get("Transaction Type", "Credit"),
+            transaction.get("Receiver Name", ""),
+            account_number,
+            receiving_dfi,
+            STANDARD_ENTRY_CLASS_MAPPING.get(transaction.get("Standard Entry Class Code"), "CCD"),
+            transaction.get("Entry Description", "VENDOR"),
+            transaction.get("Amount", ""),
+            transaction.get("Amount In Cents"),  # Set when the row was validated on load
+            transaction.get("Transaction Identifier", ""),
+            transaction.get("Reference", ""),
+        )
+
+
+def row_builder(columns, originator):
+    """
+    Return a function building an ACHTransaction straight from a CSV row (a list of strings)
+    with the given columns, the same way ACHTransaction.from_transaction maps a dictionary,
+    without building a dictionary per row.
+    """
+    # Fields read from each row, with their defaults when the column is absent or the row is short
+    fields = [
+        ("Transaction Type", "Credit"), ("Receiver Name", ""), ("Receiver Account Number", ""),
+        ("Receiver Routing Number", ""), ("Standard Entry Class Code", None), ("Entry Description", "VENDOR"),
+        ("Amount", ""), ("Transaction Identifier", ""), ("Reference", ""), ("Receiver Bank Details", ""),
+    ]
+    width = len(columns)
+    defaults = dict(fields)
+    padding = [defaults.get(column, "") for column in columns]
+    index = {column: position for position, column in enumerate(columns)}
+    absent = [default for name, default in fields if name not in index]  # Appended to every row
+    absent_positions = iter(range(width, width + len(absent)))
+    read_fields = itemgetter(*[index[name] if name in index else next(absent_positions) for name, _ in fields])
+
+    def build(row, amountInCents=None):
+        if len(row) < width:
+            row = row + padding[len(row):]
+        (transaction_type, receiver_name, account_number, receiving_dfi, standard_entry_class_code, entry_description,
+            amount, transaction_identifier, reference, receiver_bank_details) = read_fields(row + absent)
+        # Receiver bank details hold the routing number followed by the account number
+        if len(receiver_bank_details) >= 9:
+            receiving_dfi, account_number = receiver_bank_details[:9], receiver_bank_details[9:]
+        return ACHTransaction(
+            originator,
+            transaction_type,
+            receiver_name,
+            account_number,
+            receiving_dfi,
+            STANDARD_ENTRY_CLASS_MAPPING.get(standard_entry_class_code, "CCD"),
+            entry_description,
+            amount,
+            amountInCents,
+            transaction_identifier,
+            reference,
+        )
+    return build
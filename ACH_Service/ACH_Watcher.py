@@ -0,0 +1,195 @@
+import logging, os, sys, time
+from datetime import datetime
+
+# Add the parent directory of the current file to the system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ACH_Service.ACH_CSVHandler import load_transactions
+from ACH_Service.ACH_DirectoryRunner import convert_csv_file, file_summary
+from ACH_Service.ACH_Generator import ACHFileGenerator
+from ACH_Service.ACH_Transaction import ACHOriginator
+from ACH_Util.Logger import getLogger, logEvent
+
+logger = getLogger("watcher")
+
+PAYLOAD_FORMAT = "payload"  # CSV columns are the payload fields (as for 'main.py --csv')
+PROCESSING_DIRECTORY = "processing"
+DONE_DIRECTORY = "done"
+FAILED_DIRECTORY = "failed"
+OUTPUT_DIRECTORY = "ach"
+MAX_REPORTED_ISSUES = 20
+DEFAULT_RECOVERY_LEASE = 900.0  # Seconds a claimed file belongs to the watcher that claimed it
+
+
+class ACHFolderWatcher:
+    """
+    Long-running generator for CSV files dropped into a directory.
+
+    The drop directory is polled with os.scandir. A CSV is picked up only once its size and
+    modification time have not changed for ``stableSeconds``, so files still being written
+    are left alone. It is then claimed by an atomic rename into ``processing/``, so two
+    watchers on the same directory never convert the same file, provided each conversion
+    finishes within ``recoveryLease``. After conversion the input moves to ``done/``, or to
+    ``failed/`` with a ``.error.txt`` note next to it; any error raised by a file fails
+    that file only.
+
+    A file still in ``processing/`` longer than ``recoveryLease`` after its claim was left by
+    a watcher that stopped mid-conversion, and is returned to the drop directory to be retried.
+
+    Modules, the company profile and the routing directory are loaded once, so each file
+    costs only its own conversion.
+    """
+
+    def __init__(self, dropDirectory, outputDirectory=None, accountingSystem=PAYLOAD_FORMAT, companyDetail=None,
+                 routingDirectory=None, pollInterval=1.0, stableSeconds=2.0, recoveryLease=DEFAULT_RECOVERY_LEASE):
+        """
+        :param dropDirectory: Directory the CSV files are dropped into.
+        :param outputDirectory: Where ACH files are written; defaults to '<dropDirectory>/ach'.
+        :param accountingSystem: 'payload' for CSVs in the payload format, or 'Xero' / 'Default'
+                                 for accounting exports, which are mapped with companyDetail.
+        :param companyDetail: Company profile used for accounting exports (e.g. UPDATED_COMPANY_DETAILS).
+        :param routingDirectory: Optional RoutingDirectory; unknown or inactive receiving DFIs fail the file.
+        :param pollInterval: Seconds between directory scans.
+        :param stableSeconds: Seconds a file's size and modification time must stay unchanged before it is claimed.
+        :param recoveryLease: Seconds after its claim a file left in processing/ is taken as abandoned and
+                              returned to the drop directory; must exceed the longest conversion.
+        """
+        self.dropDirectory      = dropDirectory
+        self.outputDirectory    = outputDirectory or os.path.join(dropDirectory, OUTPUT_DIRECTORY)
+        self.accountingSystem   = accountingSystem
+        self.originator         = ACHOriginator.from_company(companyDetail or {})
+        self.routingDirectory   = routingDirectory
+        self.pollInterval       = pollInterval
+        self.stableSeconds      = stableSeconds
+        self.recoveryLease      = recoveryLease
+        self.processingDirectory    = os.path.join(dropDirectory, PROCESSING_DIRECTORY)
+        self.doneDirectory          = os.path.join(dropDirectory, DONE_DIRECTORY)
+        self.failedDirectory        = os.path.join(dropDirectory, FAILED_DIRECTORY)
+        self.candidates         = {}    # File name -> ((size, mtime_ns), time the signature was first seen)
+        self.stopping           = False
+
+        for directory in (self.outputDirectory, self.processingDirectory, self.doneDirectory, self.failedDirectory):
+            os.makedirs(directory, exist_ok=True)
+
+    def recover(self, now=None):
+        """
+        Return files left in processing/ by an interrupted run to the drop directory, once their
+        lease has expired. A claim stamps the file's modification time, so a file another live
+        watcher is still converting is left alone.
+        """
+        now = time.time() if now is None else now
+        with os.scandir(self.processingDirectory) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.endswith('.csv'):
+                    continue
+                try:
+                    if now - entry.stat().st_mtime < self.recoveryLease:
+                        continue
+                    os.rename(entry.path, os.path.join(self.dropDirectory, entry.name))
+                except FileNotFoundError:
+                    continue  # Finished or recovered by another watcher meanwhile
+                logEvent(logger, logging.WARNING, "file_recovered", file=entry.name)
+
+    def stable_files(self, now=None):
+        """
+        Scan the drop directory and return the names of CSV files whose size and modification
+        time have been unchanged for at least stableSeconds.
+        """
+        now = time.monotonic() if now is None else now
+        seen = {}
+        stable = []
+        with os.scandir(self.dropDirectory) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.csv') or entry.name.startswith('.') or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                signature = (stat.st_size, stat.st_mtime_ns)
+                previous = self.candidates.get(entry.name)
+                first_seen = previous[1] if previous is not None and previous[0] == signature else now
+                seen[entry.name] = (signature, first_seen)
+                if stat.st_size > 0 and now - first_seen >= self.stableSeconds:
+                    stable.append(entry.name)
+        self.candidates = seen  # Forget files that disappeared
+        return sorted(stable)
+
+    def claim(self, fileName):
+        """
+        Claim a file by renaming it into processing/.
+        :return: The claimed path, or None if another process claimed or removed it first.
+        """
+        claimed_path = os.path.join(self.processingDirectory, fileName)
+        try:
+            os.rename(os.path.join(self.dropDirectory, fileName), claimed_path)
+            os.utime(claimed_path)  # Start of the lease (see recover)
+        except FileNotFoundError:
+            return None
+        self.candidates.pop(fileName, None)
+        return claimed_path
+
+    def convert(self, csvFilePath, achFilePath):
+        """Convert one claimed CSV into an ACH file. Raises on failure, e.g. ValueError, OSError or csv.Error."""
+        if self.accountingSystem == PAYLOAD_FORMAT:
+            return convert_csv_file(csvFilePath, achFilePath, routingDirectory=self.routingDirectory)
+
+        transactions, issues = load_transactions(self.accountingSystem, csvFilePath, self.originator, self.routingDirectory)
+        if issues:
+            raise ValueError("; ".join(issues[:MAX_REPORTED_ISSUES]) + (f" (and {len(issues) - MAX_REPORTED_ISSUES} more)" if len(issues) > MAX_REPORTED_ISSUES else ""))
+        try:
+            with open(achFilePath, 'w', newline='') as ach_file:
+                ach_generator = ACHFileGenerator(transactions)
+                ach_generator.generate_to(ach_file)
+        except BaseException:
+            if os.path.exists(achFilePath):
+                os.remove(achFilePath)
+            raise
+        return file_summary(ach_generator)
+
+    def process(self, fileName):
+        """Claim, convert and file away one dropped CSV. Returns None if the file was claimed elsewhere."""
+        claimed_path = self.claim(fileName)
+        if claimed_path is None:
+            return None
+        stem = os.path.splitext(fileName)[0]
+        ach_file_path = os.path.join(self.outputDirectory, f"{stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+        start = time.perf_counter()
+        try:
+            # Written under a temporary name so consumers of the output directory never see a partial file
+            result = self.convert(claimed_path, ach_file_path + ".part")
+            os.replace(ach_file_path + ".part", ach_file_path)
+        except Exception as e:
+            # Whatever a file raises (e.g. csv.Error on an oversized field) fails that file, not the watcher
+            os.replace(claimed_path, os.path.join(self.failedDirectory, fileName))
+            with open(os.path.join(self.failedDirectory, f"{fileName}.error.txt"), 'w') as file:
+                file.write(f"{type(e).__name__}: {e}\n")
+            logEvent(logger, logging.ERROR, "file_failed", file=fileName, error=f"{type(e).__name__}: {e}")
+            return {"input": fileName, "status": "failed", "error": f"{type(e).__name__}: {e}"}
+
+        os.replace(claimed_path, os.path.join(self.doneDirectory, fileName))
+        result.update({"input": fileName, "output": ach_file_path, "status": "ok", "seconds": round(time.perf_counter() - start, 6)})
+        logEvent(logger, logging.INFO, "file_converted", **result)
+        return result
+
+    def poll_once(self):
+        """Scan once and convert every stable file. Returns the results of the converted files."""
+        self.recover()
+        results = []
+        for file_name in self.stable_files():
+            if self.stopping:
+                break  # Leave the remaining files for the next run
+            result = self.process(file_name)
+            if result is not None:
+                results.append(result)
+        return results
+
+    def run(self):
+        """Poll until stop() is called (e.g. from a signal handler)."""
+        self.stopping = False
+        logEvent(logger, logging.INFO, "watcher_started", directory=self.dropDirectory, output=self.outputDirectory, format=self.accountingSystem)
+        while not self.stopping:
+            self.poll_once()
+            if not self.stopping:
+                time.sleep(self.pollInterval)
+        logEvent(logger, logging.INFO, "watcher_stopped", directory=self.dropDirectory)
+
+    def stop(self):
+        """Stop after the file being converted, if any."""
+        self.stopping = True
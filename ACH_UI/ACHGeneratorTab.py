@@ -1,4 +1,4 @@
-import os, sys, json
+import os, sys, logging
 from datetime import datetime
 from PyQt5.QtWidgets import QVBoxLayout, QGridLayout, QLineEdit, QLabel, QHBoxLayout, QPushButton, QComboBox,QRadioButton,QButtonGroup, QFileDialog, QMessageBox
 from PyQt5.QtGui import QIntValidator, QDoubleValidator
@@ -7,15 +7,20 @@ from ACH_UI.Styles import success_buttonStyle, normal_buttonStyle
 from ACH_Constant.Constant import MANUAL_MANDATORY_FIELDS
 from ACH_Constant.Constant import UPDATED_COMPANY_DETAILS
 from ACH_Constant.Constant import TRANSACTION_DETAILS
-from ACH_Service.ACH_CSVHandler import download_template, validate_csv, read_csv_data
+from ACH_Service.ACH_CSVHandler import download_template, load_csv
 from ACH_Service.ACH_PayloadCreator import preparePayload
 from ACH_Service.ACH_Generator import ACHFileGenerator
+from ACH_Util.Amount import parseCents
+from ACH_Util.Logger import getLogger, logEvent
+
+logger = getLogger("ui")
 
 class ACHGeneratorTab:
     def __init__(self, parent):
         self.parent = parent
         self.transactionDetails = TRANSACTION_DETAILS
         self.fields = {}
+        self.transactional_data = []
         self.setup_ui()
 
     def setup_ui(self):
@@ -181,9 +186,9 @@ class ACHGeneratorTab:
         )
         if file_path:
             try:
-                # Read and validate the CSV file
+                # Validate and read the CSV file in a single pass
                 self.csv_file_path = file_path
-                issues = validate_csv(accountingSystem, file_path)
+                transactional_data, issues = load_csv(accountingSystem, file_path)
 
                 if issues:
                     # Display issues to the user
@@ -194,7 +199,8 @@ class ACHGeneratorTab:
                         f"The following issues were found in the CSV file:\n\n{issue_message}"
                     )
                 else:
-                    transactional_data = read_csv_data(accountingSystem, self.csv_file_path)
+                    # Keep the validated rows so generation does not read the file again
+                    self.transactional_data = transactional_data
                     if not transactional_data:  # Empty list or dictionary
                         QMessageBox.warning(self.parent, "No Records", "The uploaded CSV file contains no records.")
                     else:
@@ -213,12 +219,11 @@ class ACHGeneratorTab:
 
         try:
             if self.csv_radio.isChecked() and self.csv_file_path:
-                # Use the already uploaded CSV file
-                transactional_data = read_csv_data(accountingSystem, self.csv_file_path)
+                # Use the rows validated and read when the CSV file was uploaded
+                transactional_data = self.transactional_data
                 if not transactional_data:  # Empty list or dictionary
                     QMessageBox.warning(self.parent, "No Records", "The uploaded CSV file contains no records.")
-                print('transactional_data: ' + json.dumps(transactional_data, indent=4))
-                print('company_detail: ' + json.dumps(UPDATED_COMPANY_DETAILS, indent=4))
+                logEvent(logger, logging.DEBUG, "generate_ach", source="csv", rows=len(transactional_data), company=UPDATED_COMPANY_DETAILS)
                 achRequestPayload = preparePayload(UPDATED_COMPANY_DETAILS, transactional_data)
                 achFileGenerator = ACHFileGenerator(achRequestPayload)
                 achResponsePayload = achFileGenerator.generate()
@@ -238,8 +243,7 @@ class ACHGeneratorTab:
                     elif isinstance(field, QLineEdit):
                         # For QLineEdit, store the text value
                         fields_json[label] = field.text().strip()
-                print('transactional_data: ' + json.dumps(fields_json, indent=4))
-                print('company_detail: ' + json.dumps(UPDATED_COMPANY_DETAILS, indent=4))
+                logEvent(logger, logging.DEBUG, "generate_ach", source="manual", transaction=fields_json, company=UPDATED_COMPANY_DETAILS)
                 self.generateAchButton.setVisible(True)
                 # Handle manual data from form fields
                 achRequestPayload = preparePayload(UPDATED_COMPANY_DETAILS, fields_json)
@@ -333,13 +337,13 @@ class ACHGeneratorTab:
                         return False
                 if label == "Amount":
                     try:
-                        amount = float(text)  # Ensure Amount is numeric
+                        amount = parseCents(text)  # Ensure Amount is numeric with at most 2 decimal places
                         if amount <= 0:  # Check if Amount is positive
                             QMessageBox.warning(self.parent, "Invalid Amount", "The Amount must be greater than zero.")
                             return False
                     except ValueError:
                         # Notify user immediately if Amount is invalid
-                        QMessageBox.warning(self.parent, "Invalid Amount", "The Amount field must be a valid numeric value.")
+                        QMessageBox.warning(self.parent, "Invalid Amount", "The Amount field must be a valid numeric value with at most 2 decimal places.")
                         return False
 
         return True
\ No newline at end of file
@@ -0,0 +1,64 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+CENT = Decimal("0.01")
+MAX_AMOUNT_CENTS = 9999999999  # Largest amount the 10-digit amount field of an entry can hold
+AMOUNT_RANGE_MESSAGE = "Amount must be between 0.00 and 99999999.99."
+
+def parseCents(text):
+    """
+    Parse a dollar amount string into an exact integer number of cents, without going
+    through float or Decimal. This is the per-row kernel used when amounts are read.
+
+    Args:
+        text (str): The amount in dollars, e.g. "125.50", "-3", ".5" or " 10.00 ".
+
+    Returns:
+        int: The amount in cents.
+
+    Raises:
+        ValueError: If the text is not a plain decimal number (digits, an optional sign and
+                    an optional decimal point), or has more than 2 significant decimal places.
+    """
+    digits = text.strip()
+    sign = 1
+    if digits[:1] in ('-', '+'):
+        sign = -1 if digits[0] == '-' else 1
+        digits = digits[1:]
+    dollars, _, cents = digits.partition('.')
+    if len(cents) > 2:
+        if cents[2:].strip('0'):
+            raise ValueError(f"Invalid amount: '{text}' has more than 2 decimal places")
+        cents = cents[:2]
+    digits = dollars + cents.ljust(2, '0')
+    if not (dollars or cents) or not digits.isascii() or not digits.isdigit():
+        raise ValueError(f"Invalid amount: '{text}'")
+    return sign * int(digits)
+
+def toCents(amount):
+    """
+    Convert a dollar amount to an exact integer number of cents.
+
+    Args:
+        amount (str | int | float | Decimal): The amount in dollars, e.g. "125.50".
+
+    Returns:
+        int: The amount in cents. Floats, which cannot hold most cent values exactly,
+             are rounded half-up to the nearest cent.
+
+    Raises:
+        ValueError: If the amount is not a valid number, or a string or Decimal with
+                    more than 2 significant decimal places.
+    """
+    if isinstance(amount, str):
+        return parseCents(amount)
+    if isinstance(amount, int) and not isinstance(amount, bool):
+        return amount * 100
+    try:
+        value = Decimal(str(amount).strip())
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: '{amount}'")
+    if not value.is_finite():
+        raise ValueError(f"Invalid amount: '{amount}'")
+    if isinstance(amount, Decimal) and value != value.quantize(CENT, rounding=ROUND_HALF_UP):
+        raise ValueError(f"Invalid amount: '{amount}' has more than 2 decimal places")
+    return int(value.quantize(CENT, rounding=ROUND_HALF_UP) * 100)
@@ -0,0 +1,83 @@
+import json, logging, os, sys
+
+ROOT_LOGGER = "ach"
+LOG_LEVEL_ENV = "ACH_LOG_LEVEL"             # e.g. DEBUG, INFO, WARNING (default)
+LOG_ROW_SAMPLE_ENV = "ACH_LOG_ROW_SAMPLE"   # Log every Nth row at DEBUG; 0 (default) logs no rows
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+_row_sample = 0
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Format each record as one JSON object per line: time, level, logger, event and the fields
+    passed to logEvent. Fields are serialised here, so only emitted records pay for it.
+    """
+
+    def format(self, record):
+        entry = {
+            "time"      : self.formatTime(record),
+            "level"     : record.levelname,
+            "logger"    : record.name,
+            "event"     : record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def getLogger(name):
+    """Logger for a module of the generator, under the 'ach' logger."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+def configureLogging(level=None, rowSample=None, stream=None):
+    """
+    Send the generator's logs to a stream (stderr by default) as structured JSON lines.
+
+    Args:
+        level (str | int): Log level; defaults to $ACH_LOG_LEVEL, then WARNING.
+        rowSample (int | str): Log every Nth row at DEBUG; defaults to $ACH_LOG_ROW_SAMPLE, then 0 (no rows).
+        stream: Stream the records are written to.
+
+    Raises:
+        ValueError: If the level is not one of LOG_LEVELS, or the row sample is not a whole number
+                    of 0 or more. Nothing is configured in that case.
+    """
+    global _row_sample
+    level = level or os.environ.get(LOG_LEVEL_ENV) or logging.WARNING
+    if isinstance(level, str):
+        level = level.strip().upper()
+        if level not in LOG_LEVELS:
+            raise ValueError(f"Unknown log level '{level}' (--log-level or ${LOG_LEVEL_ENV}); use {', '.join(LOG_LEVELS)}.")
+    row_sample = str(rowSample if rowSample is not None else os.environ.get(LOG_ROW_SAMPLE_ENV) or 0).strip()
+    if not (row_sample.isascii() and row_sample.isdigit()):
+        raise ValueError(f"The log row sample (--log-row-sample or ${LOG_ROW_SAMPLE_ENV}) must be a whole number of 0 or more, not '{row_sample}'.")
+    _row_sample = int(row_sample)
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.setLevel(level)
+    for handler in [handler for handler in logger.handlers if isinstance(handler.formatter, StructuredFormatter)]:
+        logger.removeHandler(handler)
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(StructuredFormatter())
+    logger.addHandler(handler)
+    logger.propagate = False
+
+def logEvent(logger, level, event, **fields):
+    """
+    Log an event with structured fields. Nothing is formatted or serialised when the level
+    is disabled, so callers can pass whole dictionaries without paying for them.
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
+
+def rowSampleInterval(logger):
+    """
+    Every how many rows a per-row DEBUG event should be logged: the configured sample
+    interval while DEBUG is enabled for the logger, otherwise 0 (no per-row logging).
+    Check this once per run rather than once per row.
+    """
+    if _row_sample > 0 and logger.isEnabledFor(logging.DEBUG):
+        return _row_sample
+    return 0
@@ -0,0 +1,55 @@
+class RecordLayout:
+    """
+    A record layout compiled once from a list of FieldConfig objects.
+
+    Constant fields are pre-rendered into literal segments and every variable
+    field becomes a fixed-width slot of a single format string, so rendering a
+    record is one ``str.format`` call instead of one ``format_value`` call per field.
+    """
+
+    def __init__(self, configs):
+        self.configs    = configs
+        self.fields     = [config.name for config in configs if not config.constant]
+        self.mandatory  = [config.mandatory for config in configs if not config.constant]
+        self.length     = 0
+
+        template = ""
+        for config in configs:
+            if config.constant:
+                # Pre-render the constant segment; escape braces for str.format
+                template += config.format_value().replace("{", "{{").replace("}", "}}")
+            else:
+                align = ">" if config.padding == "left" else "<"
+                template += f"{{!s:{config.fillChar}{align}{config.length}.{config.length}}}"
+            self.length += config.length
+        self.template   = template
+        self._format    = template.format
+
+    def render(self, *values):
+        """
+        Render the record from the variable field values, in layout order.
+        :param values: One value per variable field (see ``self.fields``).
+        :return: The formatted record string.
+        """
+        if None in values:
+            values = self._fill_missing(values)
+        return self._format(*values).upper()
+
+    def generate(self, values):
+        """
+        Render the record from a dictionary keyed by field name, like RecordConfig.generate.
+        :param values: Dictionary with field names as keys and their values.
+        :return: The formatted record string.
+        """
+        return self.render(*[values.get(name, "") for name in self.fields])
+
+    def _fill_missing(self, values):
+        """Replace missing optional values with blanks, rejecting missing mandatory ones."""
+        filled = []
+        for name, mandatory, value in zip(self.fields, self.mandatory, values):
+            if value is None:
+                if mandatory:
+                    raise ValueError(f"Mandatory field '{name}' is missing.")
+                value = ""
+            filled.append(value)
+        return filled
@@ -3,8 +3,6 @@ import sys
 import os
 import re
 
-from PyQt5.QtWidgets import QMessageBox
-
 # Add the parent directory of the current file to the system path
 #sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -51,6 +49,8 @@ def saveCompanyDetails(updated_company_details):
 
 def showPopup(message, title="Information"):
     """Show a popup message."""
+    # Imported here so the headless modules can use this file without loading Qt
+    from PyQt5.QtWidgets import QMessageBox
     QMessageBox.information(None, title, message)
 
 
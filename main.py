@@ -1,9 +1,25 @@
-import sys, os, csv
+import sys, os, csv, signal
 from datetime import datetime
-from ACH_UI.Launcher import uiLauncher
-from ACH_Service.ACH_Generator import ACHFileGenerator
+
+def get_option(name, default=None):
+    """Return the value following a command-line option such as '--workers 4', or default."""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
 
 def main():
+    # Each mode imports only the modules it uses, so a run does not pay for the others' imports
+    from ACH_Util.Logger import configureLogging
+
+    # Structured logs on stderr; ACH_LOG_LEVEL / ACH_LOG_ROW_SAMPLE apply when the options are not given
+    try:
+        configureLogging(get_option('--log-level'), get_option('--log-row-sample'))
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
     # Check if CSV processing is requested
     if len(sys.argv) > 1 and sys.argv[1] == '--csv' and len(sys.argv) > 2:
         csv_file_path = sys.argv[2]
@@ -13,19 +29,6 @@ def main():
         elif not csv_file_path.endswith('.csv'):
             print(f"Error: The file '{csv_file_path}' is not a CSV file. Please provide a valid CSV file.")
         else:
-            # Process the ACH generation from CSV and directly generate ACH
-            records = []
-            with open(csv_file_path, mode='r', newline='') as file:
-                reader = csv.DictReader(file, delimiter=',')
-                for row in reader:
-                    records.append(row)
-            # Print CSV Records
-            #print(records)
-            
-            # Generate ACH
-            ach_generator = ACHFileGenerator(records)
-            achResponsePayload = ach_generator.generate()
-            
             # Extract the directory from the provided CSV file path
             file_directory = os.path.dirname(csv_file_path)
             
@@ -35,14 +38,210 @@ def main():
             ach_filename = f"{formatted_datetime}.txt"
             ach_file_path = os.path.join(file_directory, ach_filename)
             
-            # Write the ACH response payload to the file
-            with open(ach_file_path, 'w') as file:
-                file.write(achResponsePayload)
+            # Reject unknown or inactive receiving DFIs when a FedACH directory is given
+            routing_directory_path = get_option('--routing-directory')
+            routing_directory = None
+            if routing_directory_path:
+                from ACH_Service.ACH_RoutingDirectory import RoutingDirectory
+                routing_directory = RoutingDirectory.load(routing_directory_path)
+            
+            # Per-stage timings and counters, printed as JSON once the file is written
+            instrumentation = None
+            if '--stats' in sys.argv:
+                from ACH_Service.ACH_Instrumentation import Instrumentation
+                instrumentation = Instrumentation()
+            
+            # Reject payments already sent in an earlier file when a duplicate index is given
+            duplicate_index_path = get_option('--duplicate-index')
+            duplicate_index = None
+            if duplicate_index_path:
+                from ACH_Service.ACH_DuplicateIndex import DuplicateIndex, DEFAULT_WINDOW_DAYS
+                duplicate_index = DuplicateIndex(duplicate_index_path, float(get_option('--duplicate-window-days', DEFAULT_WINDOW_DAYS)))
+            
+            # Render recurring receivers from segments cached by earlier runs when a cache file is given
+            receiver_cache_path = get_option('--receiver-cache')
+            receiver_cache = None
+            if receiver_cache_path:
+                from ACH_Service.ACH_ReceiverCache import ReceiverSegmentCache
+                receiver_cache = ReceiverSegmentCache.load(receiver_cache_path)
+            
+            # Re-render only the rows that changed since the last run over this CSV
+            if '--incremental' in sys.argv:
+                if any(option is not None for option in (routing_directory, duplicate_index, receiver_cache, instrumentation)) or '--mmap' in sys.argv:
+                    print("Error: --incremental cannot be combined with --routing-directory, --duplicate-index, --receiver-cache, --stats or --mmap.")
+                    if duplicate_index is not None:
+                        duplicate_index.close()
+                    return
+                from ACH_Service.ACH_Incremental import regenerate
+                try:
+                    summary = regenerate(csv_file_path, ach_file_path, get_option('--incremental-cache'))
+                except (ValueError, KeyError) as e:
+                    print(f"Error: Unable to generate ACH file from '{csv_file_path}': {e}")
+                    return
+                print(f"ACH file has been saved at: {ach_file_path}")
+                print(f"Incremental run: {summary['reused']} entries reused, {summary['rendered']} rendered.")
+                return
+
+            # Stream CSV rows straight through entry rendering into the ACH file
+            from ACH_Service.ACH_DirectoryRunner import convert_csv_file
+            try:
+                convert_csv_file(csv_file_path, ach_file_path, int(get_option('--workers', 1)), routing_directory, instrumentation,
+                                 mapped='--mmap' in sys.argv, duplicateIndex=duplicate_index, receiverCache=receiver_cache)
+            except (ValueError, KeyError) as e:
+                print(f"Error: Unable to generate ACH file from '{csv_file_path}': {e}")
+                return
+            finally:
+                if duplicate_index is not None:
+                    duplicate_index.close()
             
             print(f"ACH file has been saved at: {ach_file_path}")
+            if receiver_cache is not None:
+                receiver_cache.save(receiver_cache_path)
+                stats = receiver_cache.stats()
+                print(f"Receiver cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%}), {stats['receivers']} receivers cached.")
+            if instrumentation is not None:
+                print(instrumentation.to_json())
+    
+    # Convert every CSV of a directory or glob pattern, several files at a time
+    elif len(sys.argv) > 2 and sys.argv[1] == '--dir':
+        from ACH_Service.ACH_DirectoryRunner import convert_directory
+        target = sys.argv[2]
+        if not os.path.isdir(target) and not any(character in target for character in '*?['):
+            print(f"Error: '{target}' is neither a directory nor a glob pattern.")
+            return
+        manifest = convert_directory(
+            target,
+            workers=int(get_option('--workers', os.cpu_count() or 1)),
+            routingDirectoryPath=get_option('--routing-directory'),
+            manifestPath=get_option('--manifest')
+        )
+        print(f"Converted {manifest['succeeded']} of {manifest['files']} CSV files ({manifest['failed']} failed).")
+        for result in manifest["results"]:
+            if result["status"] != "ok":
+                print(f"Error: Unable to generate ACH file from '{result['input']}': {result['error']}")
+        print(f"Manifest has been saved at: {manifest['manifest']}")
+    
+    # Keep running and convert CSV files as they are dropped into a directory
+    elif len(sys.argv) > 2 and sys.argv[1] == '--watch':
+        from ACH_Service.ACH_Watcher import ACHFolderWatcher, PAYLOAD_FORMAT, DEFAULT_RECOVERY_LEASE
+        drop_directory = sys.argv[2]
+        if not os.path.isdir(drop_directory):
+            print(f"Error: The specified directory '{drop_directory}' does not exist.")
+            return
+        accounting_system = get_option('--format', PAYLOAD_FORMAT)
+        if accounting_system not in (PAYLOAD_FORMAT, 'Xero', 'Default'):
+            print(f"Error: Unknown format '{accounting_system}'. Use payload, Xero or Default.")
+            return
+        
+        # Everything a conversion needs is loaded once, before the first file arrives
+        from ACH_Constant.Constant import UPDATED_COMPANY_DETAILS
+        from ACH_Service.ACH_RoutingDirectory import RoutingDirectory
+        routing_directory_path = get_option('--routing-directory')
+        watcher = ACHFolderWatcher(
+            drop_directory,
+            outputDirectory=get_option('--output-dir'),
+            accountingSystem=accounting_system,
+            companyDetail=UPDATED_COMPANY_DETAILS,
+            routingDirectory=RoutingDirectory.load(routing_directory_path) if routing_directory_path else None,
+            pollInterval=float(get_option('--poll-interval', 1.0)),
+            stableSeconds=float(get_option('--stable-seconds', 2.0)),
+            recoveryLease=float(get_option('--recovery-lease', DEFAULT_RECOVERY_LEASE))
+        )
+        signal.signal(signal.SIGTERM, lambda signum, frame: watcher.stop())
+        print(f"Watching '{drop_directory}' for CSV files; ACH files are saved in '{watcher.outputDirectory}'.")
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            pass
+    
+    # Add late entries from a CSV to a batch of an existing ACH file, in place
+    elif len(sys.argv) > 3 and sys.argv[1] == '--append':
+        from ACH_Service.ACH_Appender import append_entries
+        ach_file_path, csv_file_path = sys.argv[2], sys.argv[3]
+        if not os.path.isfile(ach_file_path) or not os.path.isfile(csv_file_path):
+            print(f"Error: Both '{ach_file_path}' and '{csv_file_path}' must exist.")
+            return
+        batch_number = get_option('--batch')
+        try:
+            with open(csv_file_path, mode='r', newline='') as csv_file:
+                result = append_entries(ach_file_path, csv.DictReader(csv_file, delimiter=','), int(batch_number) if batch_number else None)
+        except (ValueError, KeyError) as e:
+            print(f"Error: Unable to append entries from '{csv_file_path}': {e}")
+            return
+        print(f"Appended {result['appended']} entries to batch {result['batch']} of '{ach_file_path}'.")
+    
+    # Stage the transactions of one or more CSVs in a local store until the cutoff
+    elif len(sys.argv) > 3 and sys.argv[1] == '--stage':
+        from ACH_Service.ACH_StagingStore import ACHStagingStore, validate_value_date
+        store_path = sys.argv[2]
+        value_date = get_option('--value-date', '')
+        try:
+            validate_value_date(value_date)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        routing_directory_path = get_option('--routing-directory')
+        routing_directory = None
+        if routing_directory_path:
+            from ACH_Service.ACH_RoutingDirectory import RoutingDirectory
+            routing_directory = RoutingDirectory.load(routing_directory_path)
+        csv_file_paths = []
+        for argument in sys.argv[3:]:
+            if argument.startswith('--'):
+                break
+            csv_file_paths.append(argument)
+        accounting_system = get_option('--format', 'Default')
+        with ACHStagingStore(store_path) as store:
+            for csv_file_path in csv_file_paths:
+                try:
+                    staged = store.ingest(accounting_system, csv_file_path, get_option('--client', ''), value_date, routing_directory)
+                except (ValueError, KeyError, OSError) as e:
+                    print(f"Error: Unable to stage '{csv_file_path}': {e}")
+                    continue
+                print(f"Staged {staged} transactions from '{csv_file_path}'.")
+    
+    # Generate one ACH file from the staged transactions, optionally of one client or value date
+    elif len(sys.argv) > 2 and sys.argv[1] == '--generate-from':
+        from ACH_Constant.Constant import UPDATED_COMPANY_DETAILS
+        from ACH_Service.ACH_StagingStore import ACHStagingStore, validate_value_date
+        from ACH_Service.ACH_Transaction import ACHOriginator
+        store_path = sys.argv[2]
+        if not os.path.isfile(store_path):
+            print(f"Error: The specified store '{store_path}' does not exist.")
+            return
+        try:
+            validate_value_date(get_option('--value-date'))
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        ach_file_path = get_option('--output', os.path.join(os.path.dirname(store_path), f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"))
+        with ACHStagingStore(store_path) as store:
+            try:
+                ach_generator = store.generate(
+                    ach_file_path,
+                    ACHOriginator.from_company(UPDATED_COMPANY_DETAILS),
+                    client=get_option('--client'),
+                    valueDate=get_option('--value-date'),
+                    workers=int(get_option('--workers', 1))
+                )
+            except (ValueError, KeyError) as e:
+                print(f"Error: Unable to generate ACH file from '{store_path}': {e}")
+                return
+        print(f"ACH file with {ach_generator.totals.entryAddendaCount} entries has been saved at: {ach_file_path}")
+    
+    # Serve ACH generation over HTTP on this machine
+    elif len(sys.argv) > 1 and sys.argv[1] == '--serve':
+        from ACH_Constant.Constant import UPDATED_COMPANY_DETAILS
+        from ACH_Service.ACH_HTTPService import serve
+        host = get_option('--host', '127.0.0.1')
+        port = int(get_option('--port', 8080))
+        print(f"Serving ACH generation at http://{host}:{port}/generate")
+        serve(UPDATED_COMPANY_DETAILS, int(get_option('--workers', os.cpu_count() or 1)), host, port)
     
     else:
-        # If no arguments or UI mode is requested, start the GUI
+        # If no arguments or UI mode is requested, start the GUI.
+        # PyQt5 is imported only here, so CSV runs start without loading Qt.
+        from ACH_UI.Launcher import uiLauncher
         uiLauncher()
 
 if __name__ == "__main__":